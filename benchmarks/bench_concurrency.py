@@ -0,0 +1,252 @@
+"""
+Concurrency benchmark: WSGI (sync views) against ASGI (sync and async views).
+
+Run from the project root:
+
+    python benchmarks/bench_concurrency.py [--clients 200] [--db-latency-ms 5]
+
+By default the app is driven in-process against mongomock, with
+--db-latency-ms of sleep added to every collection call to stand in for a
+network round trip. Three deployments are compared:
+
+    wsgi          sync views, at most --wsgi-workers requests in flight
+                  (a threaded WSGI server such as gunicorn --threads)
+    asgi-sync     sync views under ASGI (Django runs them on one shared thread)
+    asgi-async    learning_logs/async_views.py (ASYNC_VIEWS=1)
+
+To measure real servers instead, start each deployment yourself and pass
+their base URLs, e.g.
+
+    gunicorn ll_project.wsgi -w 1 --threads 8 -b :8000
+    ASYNC_VIEWS=1 uvicorn ll_project.asgi:application --port 8001
+    python benchmarks/bench_concurrency.py --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ll_project.settings")
+
+USERNAME = "bench"
+
+
+class SlowCollection:
+    """Collection proxy that sleeps before every call, like a remote server would."""
+
+    def __init__(self, collection, latency):
+        self._collection = collection
+        self._latency = latency
+
+    @property
+    def name(self):
+        return self._collection.name
+
+    def __getattr__(self, attr):
+        value = getattr(self._collection, attr)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            time.sleep(self._latency)
+            return value(*args, **kwargs)
+        return call
+
+
+class SlowClient:
+    def __init__(self, client, latency):
+        self._client = client
+        self._latency = latency
+
+    def __getitem__(self, name):
+        return SlowDatabase(self._client[name], self._latency)
+
+    def __getattr__(self, attr):
+        return getattr(self._client, attr)
+
+
+class SlowDatabase:
+    def __init__(self, db, latency):
+        self._db = db
+        self._latency = latency
+
+    def __getitem__(self, name):
+        return SlowCollection(self._db[name], self._latency)
+
+    def __getattr__(self, attr):
+        return getattr(self._db, attr)
+
+
+def request_paths(topic_id, per_client):
+    """The request mix each simulated client sends, in order."""
+    paths = []
+    for i in range(per_client):
+        if i % 3 == 0:
+            paths.append(f"/add_entry/?topic_id={topic_id}&text=pretty+good+day+{i}")
+        elif i % 3 == 1:
+            paths.append("/topics/")
+        else:
+            paths.append(f"/entries/?topic_id={topic_id}&limit=20")
+    return paths
+
+
+def report(name, latencies, elapsed, errors):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"{name:<11} {len(latencies) / elapsed:8.0f} req/s  "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  "
+          f"errors {errors}")
+
+
+def setup_django(latency):
+    import django
+    django.setup()
+    import mongomock
+    from django.conf import settings
+    from learning_logs import mongo_client
+
+    settings.ALLOWED_HOSTS = ["*"]
+    client = mongomock.MongoClient()
+    mongo_client.use_client(SlowClient(client, latency) if latency else client)
+
+
+def use_async_views(enabled):
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    import learning_logs.urls
+    import ll_project.urls
+
+    settings.ASYNC_VIEWS = enabled
+    importlib.reload(learning_logs.urls)
+    importlib.reload(ll_project.urls)
+    clear_url_caches()
+
+
+def run_wsgi(paths_per_client, workers):
+    from django.test import Client
+
+    gate = threading.Semaphore(workers)
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def client_run(paths):
+        nonlocal errors
+        client = Client()
+        client.cookies["username"] = USERNAME
+        for path in paths:
+            start = time.perf_counter()  # includes the wait for a free worker
+            with gate:
+                status = client.get(path).status_code
+            took = time.perf_counter() - start
+            with lock:
+                latencies.append(took)
+                errors += status != 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(paths_per_client)) as pool:
+        list(pool.map(client_run, paths_per_client))
+    return latencies, time.perf_counter() - start, errors
+
+
+def run_asgi(paths_per_client):
+    from django.test import AsyncClient
+
+    latencies, errors = [], 0
+
+    async def client_run(paths):
+        nonlocal errors
+        client = AsyncClient()
+        client.cookies["username"] = USERNAME
+        for path in paths:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    async def main():
+        await asyncio.gather(*(client_run(paths) for paths in paths_per_client))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - start, errors
+
+
+def in_process(args):
+    setup_django(args.db_latency_ms / 1000)
+    from django.test import Client
+
+    use_async_views(False)
+    warm = Client()
+    warm.cookies["username"] = USERNAME
+    topic_id = warm.get("/add_topic/", {"text": "bench"}).json()["topic_id"]
+    paths = [request_paths(topic_id, args.requests) for _ in range(args.clients)]
+
+    print(f"{args.clients} clients x {args.requests} requests, "
+          f"{args.db_latency_ms} ms per Mongo call, {args.wsgi_workers} WSGI workers")
+    report("wsgi", *run_wsgi(paths, args.wsgi_workers))
+    report("asgi-sync", *run_asgi(paths))
+    use_async_views(True)
+    report("asgi-async", *run_asgi(paths))
+
+
+def against_servers(args):
+    targets = dict(target.split("=", 1) for target in args.target)
+    for name, base in targets.items():
+        base = base.rstrip("/")
+
+        def get(path):
+            req = urllib.request.Request(base + path, headers={"Cookie": f"username={USERNAME}"})
+            with urllib.request.urlopen(req, timeout=60) as response:
+                return response.status, response.read()
+
+        topic_id = json.loads(get("/add_topic/?text=bench")[1])["topic_id"]
+        latencies, errors = [], 0
+        lock = threading.Lock()
+
+        def client_run(paths):
+            nonlocal errors
+            for path in paths:
+                start = time.perf_counter()
+                try:
+                    ok = get(path)[0] == 200
+                except OSError:
+                    ok = False
+                took = time.perf_counter() - start
+                with lock:
+                    latencies.append(took)
+                    errors += not ok
+
+        paths = [request_paths(topic_id, args.requests) for _ in range(args.clients)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            list(pool.map(client_run, paths))
+        report(name, latencies, time.perf_counter() - start, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=6, help="Requests per client.")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--wsgi-workers", type=int, default=8)
+    parser.add_argument("--target", action="append", default=[],
+                        help="name=base_url of a running deployment (repeatable).")
+    args = parser.parse_args()
+    if args.target:
+        against_servers(args)
+    else:
+        in_process(args)
+
+
+if __name__ == "__main__":
+    main()
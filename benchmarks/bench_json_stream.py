@@ -0,0 +1,101 @@
+"""
+Listing serialization benchmark: JsonResponse(list(cursor)) against the
+streamed JSON array of utils/json_stream.py.
+
+Run from the project root:  python benchmarks/bench_json_stream.py [--entries 100000]
+
+The cursor is simulated by a generator that builds entry-shaped documents as
+they are read, like pymongo decoding a batch, so the numbers isolate what the
+view does with them. Peak memory comes from tracemalloc. Time to first byte is
+measured until the first chunk after the opening bracket.
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ll_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bson import ObjectId  # noqa: E402
+from django.http import JsonResponse, StreamingHttpResponse  # noqa: E402
+
+from learning_logs.utils import json_stream  # noqa: E402
+
+
+def cursor(n):
+    start = datetime(2024, 1, 1)
+    topic_id = ObjectId()
+    for i in range(n):
+        yield {
+            "_id": ObjectId(),
+            "topic_id": topic_id,
+            "text": f"Learned about cursors and batching today, entry number {i}.",
+            "sentiment": "positive",
+            "score": 0.4404,
+            "date_added": start + timedelta(minutes=i),
+        }
+
+
+def plain_json(n):
+    docs = list(cursor(n))
+    for doc in docs:  # what a JsonResponse caller has to do first
+        doc["_id"] = str(doc["_id"])
+        doc["topic_id"] = str(doc["topic_id"])
+        doc["date_added"] = doc["date_added"].isoformat()
+    response = JsonResponse(docs, safe=False)
+    first = time.perf_counter()
+    return first, len(response.content)
+
+
+def streamed(n):
+    response = StreamingHttpResponse(json_stream.stream_array(cursor(n)), content_type="application/json")
+    chunks = iter(response.streaming_content)
+    size = len(next(chunks))
+    size += len(next(chunks))
+    first = time.perf_counter()
+    for chunk in chunks:
+        size += len(chunk)
+    return first, size
+
+
+def measure(fn, n):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first, size = fn(n)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first - start, total, peak / 2**20, size / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    runs = [("JsonResponse", plain_json)]
+    if json_stream.orjson is not None:
+        runs.append(("stream (orjson)", streamed))
+    for name, fn in runs:
+        ttfb, total, peak, size = measure(fn, args.entries)
+        print(f"{name:<18} ttfb {ttfb * 1000:8.1f} ms  total {total * 1000:8.1f} ms  "
+              f"peak {peak:7.1f} MiB  body {size:6.1f} MiB")
+
+    # the same stream without orjson
+    sys.modules["orjson"] = None
+    importlib.reload(json_stream)
+    ttfb, total, peak, size = measure(streamed, args.entries)
+    print(f"{'stream (stdlib)':<18} ttfb {ttfb * 1000:8.1f} ms  total {total * 1000:8.1f} ms  "
+          f"peak {peak:7.1f} MiB  body {size:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
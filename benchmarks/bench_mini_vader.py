@@ -0,0 +1,117 @@
+"""
+Throughput benchmark for MiniVader.
+
+Run from the project root:  python benchmarks/bench_mini_vader.py
+
+"trie" is a frozen analyzer, which matches phrases through its token trie.
+"scan" is a mutable one, which joins and probes the lexicon like the
+original matcher did. learning_logs/tests.py checks that the two agree.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ll_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from learning_logs.mini_vader import MiniVader  # noqa: E402
+from learning_logs.sentiment import get_analyzer  # noqa: E402
+
+
+WORDS = [
+    "the", "movie", "was", "not", "good", "very", "really", "love", "kind", "of",
+    "bad", "at", "all", "GREAT", "terrible", "so", "sad", "but", "happy", "today",
+    "never", "excellent", "I", "it", "nice", "!", "?", "...", "😊", "😭",
+]
+
+
+def make_corpus(n_texts, length, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(length)) for _ in range(n_texts)]
+
+
+def bench(analyzer, corpus, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            analyzer.analyze(text)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def bench_per_entry(score, corpus):
+    """Time and count allocations for scoring one entry at a time, as Entry.save does."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for text in corpus:
+        score(text)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / len(corpus) * 1e6, peak
+
+
+def main():
+    for length in (8, 40, 200):
+        corpus = make_corpus(1000, length)
+        fast = bench(MiniVader().freeze(), corpus)
+        slow = bench(MiniVader(), corpus)
+        print(f"{length:>4} tokens/text  trie {fast:10.0f} texts/s  scan {slow:10.0f} texts/s  "
+              f"x{fast / slow:.2f}")
+
+    corpus = make_corpus(2000, 12)
+    shared = get_analyzer()
+    for name, score in (("new MiniVader per entry", lambda t: MiniVader().analyze(t)),
+                        ("shared get_analyzer()", shared.analyze)):
+        us, peak = bench_per_entry(score, corpus)
+        print(f"{name:<24} {us:8.1f} us/entry  peak {peak / 1024:8.1f} KiB")
+
+    corpus = make_corpus(20000, 40)
+    analyzer = get_analyzer()
+    for processes in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        for _ in analyzer.analyze_many(corpus, processes=processes):
+            pass
+        rate = len(corpus) / (time.perf_counter() - start)
+        print(f"analyze_many processes={processes:<3} {rate:10.0f} texts/s")
+
+    try:
+        from learning_logs.utils.vader_corpus import CorpusScorer
+    except ImportError:
+        print("numpy not installed, skipping corpus mode")
+        return
+    from learning_logs.sentiment import score_batch
+
+    # the mixed corpus falls back to the scalar path almost everywhere, the
+    # unigram one (no phrases, no "but") hardly ever
+    unigram = [w for w in WORDS if w not in ("not", "very", "really", "kind", "at", "but")]
+    rng = random.Random(3)
+    corpora = (("mixed", corpus),
+               ("unigram", [" ".join(rng.choice(unigram) for _ in range(40)) for _ in range(20000)]))
+    for name, texts in corpora:
+        scorer = CorpusScorer(analyzer)
+        if scorer.analyze_corpus(texts) != [analyzer.analyze(t) for t in texts]:
+            raise SystemExit("corpus mode does not match analyze()")
+        fallback = scorer.last_fallback_rate
+        plain = bench(analyzer, texts)
+        rates = []
+        for score in (scorer.analyze_corpus, score_batch):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                score(texts)
+                best = min(best, time.perf_counter() - start)
+            rates.append(len(texts) / best)
+        print(f"{name:<8} fallback {fallback:4.0%}  analyze {plain:8.0f}  "
+              f"analyze_corpus {rates[0]:8.0f}  score_batch {rates[1]:8.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Entry search benchmark: the BM25 inverted index against a `$regex` scan and
+MongoDB `$text`.
+
+Run from the project root:
+
+    python benchmarks/bench_search.py [--entries 20000] [--mongo-uri mongodb://localhost:27017/]
+
+Without --mongo-uri everything runs on mongomock, which has no `$text`, so
+that row is skipped. mongomock also has no real indexes and answers every
+query by scanning, so its timings only show relative Python overhead. The
+"examined" counts show the difference a server will see: the index reads only
+the postings of the query terms, while `$regex` has to read every one of the
+user's entries. With a real server the benchmark works in a scratch
+database (bench_search) that it drops afterwards.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ll_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bson import ObjectId  # noqa: E402
+
+from learning_logs.sentiment import get_analyzer  # noqa: E402
+from learning_logs.utils.search_index import SearchIndex, parse_query  # noqa: E402
+
+USERNAME = "bench"
+WORDS = (
+    "python django mongo sentiment learned today great hard bug fixed test index query "
+    "summary graph model view template cursor lexicon entry topic async stream cache"
+).split() + [f"word{i}" for i in range(3000)]
+QUERIES = ["python", "cursor index", "great bug", '"learned today"', "word17 word230 mongo"]
+
+
+def make_entries(n, seed=5):
+    rng = random.Random(seed)
+    topics = [ObjectId() for _ in range(20)]
+    return [{
+        "_id": ObjectId(),
+        "username": USERNAME,
+        "topic_id": rng.choice(topics),
+        "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))),
+        "sentiment": rng.choice(["positive", "negative", "neutral"]),
+    } for _ in range(n)]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--mongo-uri")
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri)
+        client.drop_database("bench_search")
+        db = client["bench_search"]
+    else:
+        import mongomock
+        client = None
+        db = mongomock.MongoClient()["bench_search"]
+
+    entries, postings, stats = db["entries"], db["search_postings"], db["search_stats"]
+    if client is not None:
+        # mongomock checks unique indexes by scanning, which would dominate the build time
+        postings.create_index([("username", 1), ("term", 1), ("entry_id", 1)], unique=True)
+    index = SearchIndex(postings, stats, get_analyzer())
+
+    docs = make_entries(args.entries)
+    entries.insert_many(docs)
+    start = time.perf_counter()
+    for k in range(0, len(docs), 1000):
+        index.add(docs[k:k + 1000])
+    print(f"indexed {len(docs)} entries in {time.perf_counter() - start:.1f}s, "
+          f"{postings.count_documents({})} postings")
+
+    has_text = client is not None
+    if has_text:
+        entries.create_index([("text", "text")])
+
+    for query in QUERIES:
+        words = query.replace('"', "").split()
+        ms_index, hits = timed(lambda: index.search(USERNAME, query, limit=20))
+        pattern = "|".join(words) if '"' not in query else " ".join(words)
+        ms_regex, found = timed(lambda: list(entries.find(
+            {"username": USERNAME, "text": {"$regex": pattern, "$options": "i"}}, {"_id": 1})))
+        terms, phrases = parse_query(index.analyzer, query)
+        examined = postings.count_documents(
+            {"username": USERNAME, "term": {"$in": sorted(set(terms).union(*phrases))}})
+        line = (f"{query:<22} index {ms_index:8.2f} ms ({len(hits)} hits, {examined} examined)   "
+                f"$regex {ms_regex:8.2f} ms ({len(found)} matches, {len(docs)} examined)")
+        if has_text:
+            ms_text, found = timed(lambda: list(entries.find(
+                {"$text": {"$search": query}, "username": USERNAME},
+                {"score": {"$meta": "textScore"}}).sort([("score", {"$meta": "textScore"})]).limit(20)))
+            line += f"   $text {ms_text:8.2f} ms"
+        else:
+            line += "   $text skipped (mongomock)"
+        print(line)
+
+    if client is not None:
+        client.drop_database("bench_search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+LexRank benchmark: sumy's dense summarizer against the native sparse engine.
+
+Run from the project root:  python benchmarks/bench_summarize.py [--sizes ...] [--sumy-max N]
+
+Topics are synthetic, two sentences per entry. By default every size is
+also run through sumy, which builds an N x N matrix in pure Python. That
+takes minutes at 1000 entries and hours at 10000. Pass --sumy-max 1000 (or
+100) to skip sumy above that many entries. When NLTK's punkt data is
+missing, sumy is fed pre-split sentences so that only its ranking cost is
+measured.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from learning_logs.utils.lexrank import LexRank, split_sentences  # noqa: E402
+
+WORDS = (
+    "python django mongo sentiment learned today the a is great hard bug fixed test "
+    "index query summary graph model view template cursor lexicon entry topic"
+).split() + [f"term{i}" for i in range(1500)]
+
+
+def make_topic(n_entries, seed=3):
+    rng = random.Random(seed)
+    sentence = lambda k: " ".join(rng.choice(WORDS) for _ in range(k)).capitalize() + "."  # noqa: E731
+    return [f"{sentence(12)} {sentence(8)}" for _ in range(n_entries)]
+
+
+def sumy_summarize(texts, count=3):
+    from sumy.summarizers.lex_rank import LexRankSummarizer
+    summarizer = LexRankSummarizer()
+    try:
+        from sumy.parsers.plaintext import PlaintextParser
+        from sumy.nlp.tokenizers import Tokenizer
+        document = PlaintextParser.from_string("\n".join(texts), Tokenizer("english")).document
+        return summarizer(document, count)
+    except LookupError:
+        sentences = split_sentences(texts)
+        words = [re.findall(r"\w+", s.lower()) for s in sentences]
+        tf = summarizer._compute_tf(words)
+        idf = summarizer._compute_idf(words)
+        matrix = summarizer._create_matrix(words, summarizer.threshold, tf, idf)
+        return summarizer.power_method(matrix, summarizer.epsilon)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--sumy-max", type=int, default=None,
+                        help="Skip sumy above this many entries (default: run it for every size).")
+    args = parser.parse_args()
+    if args.sumy_max is None:
+        args.sumy_max = max(args.sizes)
+
+    engines = [
+        ("native", LexRank().summarize),
+        ("native top-2000", LexRank(max_sentences=2000).summarize),
+        ("native recent-2000", LexRank(max_sentences=2000, preselect="recent").summarize),
+    ]
+    for size in args.sizes:
+        texts = make_topic(size)
+        for name, fn in engines:
+            elapsed, peak = measure(fn, texts)
+            print(f"{size:>6} entries  {name:<20} {elapsed:8.2f}s  peak {peak:8.1f} MiB")
+        if size <= args.sumy_max:
+            elapsed, peak = measure(sumy_summarize, texts)
+            print(f"{size:>6} entries  {'sumy':<20} {elapsed:8.2f}s  peak {peak:8.1f} MiB")
+        else:
+            print(f"{size:>6} entries  {'sumy':<20}  skipped (--sumy-max {args.sumy_max})")
+
+
+if __name__ == "__main__":
+    main()
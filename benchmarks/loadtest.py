@@ -0,0 +1,408 @@
+"""
+Load-test harness: replay a JSONL request log against the app and report
+latency percentiles and throughput per URL name.
+
+Run from the project root:
+
+    python benchmarks/loadtest.py generate --users 20 --topics 5 --entries 50 \\
+        --requests 5000 --rate 200 -o workload.jsonl
+    python benchmarks/loadtest.py run workload.jsonl                  in-process, mongomock
+    python benchmarks/loadtest.py run workload.jsonl --mongo-uri mongodb://localhost:27017/
+    python benchmarks/loadtest.py serve --port 8000                    WSGI server on mongomock
+    python benchmarks/loadtest.py run workload.jsonl --target http://127.0.0.1:8000
+
+One request per line:
+
+    {"t": 1.25, "method": "GET", "path": "/entries/", "query": {"topic_id": "{topic:user3:0}"},
+     "cookies": {"username": "user3"}, "body": "...", "content_type": "...",
+     "phase": "setup", "save": {"topic:user3:0": "topic_id"}}
+
+Only path is required. t is the send time in seconds from the start of the
+run. "{name}" in the path, query values or body is replaced by a value that
+an earlier response saved: "save" maps a name to a field of that response's
+JSON body. That is how a generated workload points at topics created during
+the run. Setup records run first, one at a time, and are not measured.
+
+The replay is open-loop. Every record is sent at its own time (scaled by
+--speed, or evenly spaced at --rate), whether or not earlier requests have
+returned, from a pool of --concurrency threads. Latency is measured from
+the scheduled send time. A saturated app therefore shows up as queueing
+latency instead of a quietly lower request rate.
+
+In-process runs go through Django's test client against mongomock (or a
+real server with --mongo-uri, in a scratch database dropped afterwards).
+Against --target the requests go over HTTP to a running deployment. serve
+starts a threaded WSGI server on mongomock for that. Requests are grouped by
+the url name they resolve to in learning_logs/urls.py.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ll_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.urls import Resolver404, resolve  # noqa: E402
+
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][\w:.-]*)\}")
+
+WORDS = (
+    "today learned python django mongo cursor index query summary topic entry async stream "
+    "cache lexicon template graph model test bug fix deploy review"
+).split()
+MOODS = ["good", "great", "excellent", "nice", "bad", "terrible", "sad", "happy", "not good", "very good"]
+DEFAULT_MIX = "get_entries=35,get_topics=20,add_entry=20,search_entries=10,sentiment_trend=10,summary_page=5"
+SCRATCH_DB = "learning_log_loadtest"
+
+
+# workload generation
+
+def entry_text(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 30))]
+    words.insert(rng.randrange(len(words)), rng.choice(MOODS))
+    return " ".join(words)
+
+
+def _timed_record(name, rng, user, topic):
+    if name == "get_topics":
+        return {"path": "/topics/"}
+    if name == "get_entries":
+        return {"path": "/entries/", "query": {"topic_id": topic, "limit": 20}}
+    if name == "add_entry":
+        return {"path": "/add_entry/", "query": {"topic_id": topic, "text": entry_text(rng)}}
+    if name == "search_entries":
+        return {"path": "/search/", "query": {"q": " ".join(rng.sample(WORDS, rng.randint(1, 2)))}}
+    if name == "sentiment_trend":
+        return {"path": "/trend/", "query": {"days": 30}}
+    if name == "summary_page":
+        return {"path": f"/summary/{topic}/"}
+    raise ValueError(f"unknown request kind {name!r}")
+
+
+def generate(users, topics, entries, requests, rate, mix, seed=1):
+    """
+    Setup records that create users x topics topics with `entries` entries
+    each (through the bulk endpoint), then `requests` timed records with
+    Poisson arrivals at `rate` per second, drawn from `mix` ({url name: weight}).
+    """
+    rng = random.Random(seed)
+    records = []
+    for u in range(users):
+        user = f"user{u}"
+        for k in range(topics):
+            var = f"topic:{user}:{k}"
+            records.append({"phase": "setup", "path": "/add_topic/", "query": {"text": f"topic {k}"},
+                            "cookies": {"username": user}, "save": {var: "topic_id"}})
+            for start in range(0, entries, 1000):
+                body = "\n".join(json.dumps({"topic_id": "{" + var + "}", "text": entry_text(rng)})
+                                 for _ in range(min(1000, entries - start)))
+                records.append({"phase": "setup", "method": "POST", "path": "/entries/bulk/",
+                                "body": body, "content_type": "application/x-ndjson",
+                                "cookies": {"username": user}})
+
+    names, weights = zip(*mix.items())
+    t = 0.0
+    for _ in range(requests):
+        t += rng.expovariate(rate)
+        user = rng.randrange(users)
+        topic = "{topic:user%d:%d}" % (user, rng.randrange(topics))
+        record = _timed_record(rng.choices(names, weights)[0], rng, f"user{user}", topic)
+        record.update({"t": round(t, 4), "cookies": {"username": f"user{user}"}})
+        records.append(record)
+    return records
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# replay
+
+def load_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def url_name(path):
+    try:
+        return resolve(urlsplit(path).path).url_name or "<unnamed>"
+    except Resolver404:
+        return "<unmatched>"
+
+
+class Replayer:
+    """Sends records to the in-process app or an HTTP target, substituting saved values."""
+
+    def __init__(self, target=None, timeout=60):
+        self.target = target.rstrip("/") if target else None
+        self.timeout = timeout
+        self.saved = {}
+        self._local = threading.local()
+
+    def _fill(self, value):
+        if not isinstance(value, str):
+            return value
+        return _PLACEHOLDER_RE.sub(lambda m: str(self.saved.get(m.group(1), m.group(0))), value)
+
+    def prepare(self, record):
+        """(method, full path, body, content type, cookie header) with placeholders filled."""
+        path = self._fill(record["path"])
+        query = {key: self._fill(value) for key, value in (record.get("query") or {}).items()}
+        if query:
+            path += ("&" if "?" in path else "?") + urlencode(query)
+        body = self._fill(record.get("body") or "")
+        cookies = "; ".join(f"{key}={self._fill(value)}" for key, value in (record.get("cookies") or {}).items())
+        return record.get("method", "GET").upper(), path, body, record.get("content_type", "application/json"), cookies
+
+    def send(self, record):
+        """(status, body bytes) of one record; status 0 for a connection failure."""
+        method, path, body, content_type, cookies = self.prepare(record)
+        if self.target is None:
+            client = getattr(self._local, "client", None)
+            if client is None:
+                from django.test import Client
+                client = self._local.client = Client()
+            extra = {"HTTP_COOKIE": cookies} if cookies else {}
+            response = client.generic(method, path, body.encode("utf-8"), content_type, **extra)
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+            return response.status_code, content
+
+        headers = {"Content-Type": content_type}
+        if cookies:
+            headers["Cookie"] = cookies
+        req = urllib.request.Request(self.target + path, data=body.encode("utf-8") if body else None,
+                                     headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except OSError:
+            return 0, b""
+
+    def save(self, record, content):
+        if not record.get("save"):
+            return
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return
+        for name, field in record["save"].items():
+            if isinstance(data, dict) and field in data:
+                self.saved[name] = data[field]
+
+
+def run_setup(replayer, records):
+    failed = 0
+    start = time.perf_counter()
+    for record in records:
+        status, content = replayer.send(record)
+        failed += not 200 <= status < 400
+        replayer.save(record, content)
+    return time.perf_counter() - start, failed
+
+
+def run_timed(replayer, records, concurrency, speed=1.0, rate=None):
+    """Replay open-loop; returns ({url name: [(latency, status)]}, wall seconds, max send lag)."""
+    results = defaultdict(list)
+    lock = threading.Lock()
+    max_lag = 0.0
+
+    def fire(record, due):
+        status, content = replayer.send(record)
+        took = time.perf_counter() - due
+        replayer.save(record, content)
+        with lock:
+            results[url_name(replayer._fill(record["path"]))].append((took, status))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        for k, record in enumerate(records):
+            offset = k / rate if rate else record.get("t", 0.0) / speed
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+            pool.submit(fire, record, due)
+    return results, time.perf_counter() - start, max_lag
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))]
+
+
+def summarize(results, elapsed):
+    rows = []
+    everything = [item for items in results.values() for item in items]
+    for name, items in sorted(results.items()) + [("TOTAL", everything)]:
+        latencies = sorted(took for took, _ in items)
+        rows.append({
+            "name": name,
+            "requests": len(items),
+            "errors": sum(not 200 <= status < 400 for _, status in items),
+            "req_per_s": len(items) / elapsed if elapsed else 0.0,
+            "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        })
+    return rows
+
+
+def print_report(rows):
+    print(f"{'url name':<22} {'requests':>8} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        print(f"{row['name']:<22} {row['requests']:>8} {row['errors']:>7} {row['req_per_s']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+
+def use_database(mongo_uri):
+    """Point the app at mongomock, or at a scratch database on a real server."""
+    from django.conf import settings
+    from learning_logs import mongo_client
+
+    settings.ALLOWED_HOSTS = ["*"]
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri)
+        settings.MONGO_DB_NAME = SCRATCH_DB
+        client.drop_database(SCRATCH_DB)
+        mongo_client.use_client(client)
+        from django.core.management import call_command
+        call_command("ensure_indexes")
+        return client
+    import mongomock
+    mongo_client.use_client(mongomock.MongoClient())
+    return None
+
+
+# commands
+
+def cmd_generate(args):
+    records = generate(args.users, args.topics, args.entries, args.requests, args.rate,
+                       parse_mix(args.mix), args.seed)
+    out = open(args.output, "w") if args.output != "-" else sys.stdout
+    try:
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    setup = sum(record.get("phase") == "setup" for record in records)
+    print(f"{len(records) - setup} timed and {setup} setup records", file=sys.stderr)
+
+
+def cmd_run(args):
+    records = load_records(args.workload)
+    if args.limit:
+        timed = [record for record in records if record.get("phase") != "setup"][:args.limit]
+        records = [record for record in records if record.get("phase") == "setup"] + timed
+
+    server = None if args.target else use_database(args.mongo_uri)
+    replayer = Replayer(args.target)
+    try:
+        setup = [record for record in records if record.get("phase") == "setup"]
+        timed = [record for record in records if record.get("phase") != "setup"]
+        if setup:
+            took, failed = run_setup(replayer, setup)
+            print(f"setup: {len(setup)} requests in {took:.1f}s, {failed} failed")
+
+        results, elapsed, lag = run_timed(replayer, timed, args.concurrency, args.speed, args.rate)
+        offered = len(timed) / elapsed if elapsed else 0.0
+        print(f"{len(timed)} requests in {elapsed:.1f}s ({offered:.0f} req/s offered, "
+              f"{args.concurrency} threads, max send lag {lag * 1000:.0f} ms)")
+        rows = summarize(results, elapsed)
+        print_report(rows)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(rows, f, indent=2)
+    finally:
+        if server is not None:
+            server.drop_database(SCRATCH_DB)
+
+
+def cmd_serve(args):
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    from django.core.wsgi import get_wsgi_application
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = use_database(args.mongo_uri)
+    httpd = make_server(args.host, args.port, get_wsgi_application(),
+                        server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    print(f"serving on http://{args.host}:{args.port}/ ({'scratch db' if server else 'mongomock'})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.drop_database(SCRATCH_DB)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="Write a synthetic workload.")
+    gen.add_argument("--users", type=int, default=10)
+    gen.add_argument("--topics", type=int, default=5, help="Topics per user.")
+    gen.add_argument("--entries", type=int, default=20, help="Entries per topic, created during setup.")
+    gen.add_argument("--requests", type=int, default=1000, help="Timed requests.")
+    gen.add_argument("--rate", type=float, default=50.0, help="Mean requests per second.")
+    gen.add_argument("--mix", default=DEFAULT_MIX, help="url_name=weight,... of the timed requests.")
+    gen.add_argument("--seed", type=int, default=1)
+    gen.add_argument("-o", "--output", default="-")
+
+    run = commands.add_parser("run", help="Replay a workload and report latency per url name.")
+    run.add_argument("workload")
+    run.add_argument("--target", help="Base URL of a running deployment (default: in-process).")
+    run.add_argument("--mongo-uri", help="In-process only: use this server instead of mongomock.")
+    run.add_argument("--concurrency", type=int, default=32)
+    run.add_argument("--speed", type=float, default=1.0, help="Replay faster (>1) or slower than recorded.")
+    run.add_argument("--rate", type=float, help="Ignore recorded times and send this many per second.")
+    run.add_argument("--limit", type=int, help="Only replay the first N timed records.")
+    run.add_argument("--json", help="Also write the report rows to this file.")
+
+    serve = commands.add_parser("serve", help="Run the app on a threaded WSGI server for --target runs.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--mongo-uri")
+
+    args = parser.parse_args()
+    {"generate": cmd_generate, "run": cmd_run, "serve": cmd_serve}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Benchmark suite with stored baselines, for catching performance regressions.
+
+Run from the project root:
+
+    python benchmarks/suite.py                  compare with the stored baseline
+    python benchmarks/suite.py --save           store the current timings as the baseline
+    python benchmarks/suite.py -k analyze -k but    only cases whose name contains a filter
+    python benchmarks/suite.py --list
+
+Every case is timed asv-style: the call count is calibrated until one run
+takes at least --min-time, then --repeat runs are made, and the fastest
+per-call time is kept because it is the least affected by noise. A case
+fails when it is more than --threshold (default 0.25, i.e. 25%) slower than
+its baseline, and the suite then exits with status 1. Cases without a
+baseline are reported as new and never fail.
+
+Baselines live in benchmarks/baselines.json, keyed by --machine
+($BENCH_MACHINE, else the host name), because timings from different
+machines cannot be compared. --save only replaces the cases that ran. The
+file is checked in with a "ci" entry, so CI compares against it:
+
+    BENCH_MACHINE=ci python benchmarks/suite.py
+
+When a change is meant to make things slower, or the CI runner changes,
+refresh that entry on the runner with `BENCH_MACHINE=ci python
+benchmarks/suite.py --save` and commit the file. Keep baselines saved under
+your own host name out of commits.
+
+The view cases drive the Django app in-process, through the test client,
+against mongomock swapped in with mongo_client.use_client, with a fresh
+database per case. Those timings include mongomock's pure-Python query
+engine. Regressions there are real, but absolute numbers say little about a
+real server.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ll_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+WORDS = [
+    "the", "movie", "was", "today", "I", "it", "learned", "about", "python", "and",
+    "mongo", "we", "tried", "again", "then", "nice", "sad", "GREAT", "terrible", "happy",
+    "very", "really", "so", "never", "excellent", "!", "?", "😊", "😭",
+]
+PHRASES = ["not good", "very good", "really love", "kind of bad", "not at all good"]
+
+CASES = {}
+
+
+class Skip(Exception):
+    pass
+
+
+def case(name):
+    """Register a setup function that returns the callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def make_text(rng, length, phrase_density=0.0, but=False):
+    """
+    `length` words of filler, where roughly `phrase_density` of the words
+    belong to multi-word lexicon phrases. `but` puts a contrast clause in
+    the middle.
+    """
+    words = []
+    while len(words) < length:
+        if rng.random() < phrase_density / 2.5:   # phrases average 2.6 words
+            words.extend(rng.choice(PHRASES).split())
+        else:
+            words.append(rng.choice(WORDS))
+    words = words[:length]
+    if but:
+        words.insert(len(words) // 2, "but")
+    return " ".join(words)
+
+
+# MiniVader
+
+def _analyze_case(length, density, but=False):
+    def setup():
+        from learning_logs.mini_vader import MiniVader
+        analyzer = MiniVader().freeze()   # frozen, like get_analyzer()
+        rng = random.Random(length * 100 + int(density * 100))
+        texts = [make_text(rng, length, density, but) for _ in range(50)]
+
+        def run():
+            for text in texts:
+                analyzer.analyze(text)
+        return run, len(texts)
+    return setup
+
+
+for _length in (10, 100, 1000):
+    for _density in (0.0, 0.1, 0.3):
+        case(f"analyze/words={_length}/phrases={_density}")(_analyze_case(_length, _density))
+    case(f"analyze_but/words={_length}")(_analyze_case(_length, 0.1, but=True))
+
+
+# summaries
+
+def _summ_case(engine, n_entries):
+    def setup():
+        from bson import ObjectId
+        from learning_logs import mongo_client
+        from learning_logs.utils.summaries import build_topic_summary
+
+        db = _fresh_db()
+        rng = random.Random(n_entries)
+        topic_id = ObjectId()
+        db.entries_collection.insert_many([{
+            "topic_id": topic_id,
+            "text": f"{make_text(rng, 12).capitalize()}. {make_text(rng, 8).capitalize()}.",
+        } for _ in range(n_entries)])
+
+        def run():
+            with override_settings(SUMMARY_ENGINE=engine):
+                build_topic_summary(topic_id, 0, mongo_client.entries_collection, mongo_client.summaries_collection)
+        try:
+            run()
+        except LookupError as e:   # sumy's tokenizer needs NLTK's punkt data
+            raise Skip(str(e).strip().splitlines()[0])
+        return run, 1
+    return setup
+
+
+for _n in (10, 100, 1000):
+    case(f"summ/native/entries={_n}")(_summ_case("native", _n))
+for _n in (10, 100):
+    case(f"summ/sumy/entries={_n}")(_summ_case("sumy", _n))
+
+
+# views
+
+def _fresh_db():
+    import mongomock
+    from learning_logs import mongo_client
+    mongo_client.use_client(mongomock.MongoClient())
+    return mongo_client
+
+
+def _client_with_topic(n_entries):
+    from learning_logs import mongo_client
+    from learning_logs.views import analyzer, new_entry
+
+    db = _fresh_db()
+    client = Client()
+    client.cookies["username"] = "bench"
+    client.get("/add_topic/", {"text": "bench topic"})
+    topic_id = db.topics_collection.find_one({"username": "bench"})["_id"]
+    rng = random.Random(n_entries)
+    if n_entries:
+        mongo_client.entries_collection.insert_many([
+            new_entry(topic_id, text, "bench", analyzer.analyze(text))
+            for text in (make_text(rng, 20, 0.1) for _ in range(n_entries))
+        ])
+    return client, str(topic_id)
+
+
+def _get_entries_case(n_entries):
+    def setup():
+        client, topic_id = _client_with_topic(n_entries)
+
+        def run():
+            # walk every page, so the time is for listing all n entries
+            params = {"topic_id": topic_id}
+            while True:
+                response = client.get("/entries/", params)
+                assert response.status_code == 200, response.content
+                cursor = response.json()["next"]
+                if cursor is None:
+                    break
+                params["after"] = cursor
+        return run, 1
+    return setup
+
+
+for _n in (10, 100, 1000):
+    case(f"view/get_entries/entries={_n}")(_get_entries_case(_n))
+
+
+@case("view/add_entry")
+def _add_entry():
+    client, topic_id = _client_with_topic(100)
+    rng = random.Random(1)
+
+    def run():
+        # distinct texts, so the near-duplicate check does not short-circuit anything
+        response = client.get("/add_entry/", {"topic_id": topic_id, "text": make_text(rng, 20, 0.1)})
+        assert response.status_code == 200, response.content
+    return run, 1
+
+
+# runner
+
+def measure(run, per_run, repeat, min_time):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        best = min(best, time.perf_counter() - start)
+    return best / (number * per_run)
+
+
+def fmt(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", action="append", default=[], help="Only run cases containing this text.")
+    parser.add_argument("--save", action="store_true", help="Store the timings as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("BENCH_THRESHOLD", 0.25)),
+                        help="Allowed slowdown against the baseline (0.25 = 25%%).")
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--machine", default=os.environ.get("BENCH_MACHINE") or platform.node() or "default")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed run.")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if not args.k or any(k in name for k in args.k)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    setup_test_environment()   # lets the test client through ALLOWED_HOSTS
+    baselines = load_baselines(args.baselines)
+    machine = baselines.setdefault(args.machine, {})
+    results, regressions = {}, []
+    print(f"{'case':<40} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name in names:
+        try:
+            run, per_run = CASES[name]()
+        except Skip as e:
+            print(f"{name:<40} {'':>10} {'skipped':>10}   {e}")
+            continue
+        seconds = measure(run, per_run, args.repeat, args.min_time)
+        results[name] = seconds
+        base = machine.get(name)
+        if base is None:
+            print(f"{name:<40} {'':>10} {fmt(seconds):>10} {'new':>8}")
+            continue
+        change = seconds / base - 1
+        status = ""
+        if change > args.threshold:
+            status = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {fmt(base):>10} {fmt(seconds):>10} {change:>+8.0%}{status}")
+
+    if args.save:
+        machine.update(results)
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"saved {len(results)} baselines for {args.machine} to {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} case(s) more than {args.threshold:.0%} slower than the baseline: "
+              + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+from .mongo_client import activities_collection, activity_buckets_collection
+from .utils.activity_buffer import ActivityBuffer
+from .utils.activity_graph import ActivityBuckets, ActivityGraph, LeaderboardCache
+
+
+@lru_cache(maxsize=None)
+def get_activity_buffer():
+    """The process-wide buffer for ActivityGraph, or None when ACTIVITY_BUFFER is off."""
+    if not getattr(settings, "ACTIVITY_BUFFER", True):
+        return None
+    return ActivityBuffer(
+        activities_collection,
+        interval=getattr(settings, "ACTIVITY_FLUSH_INTERVAL", 5.0),
+        max_keys=getattr(settings, "ACTIVITY_FLUSH_MAX_KEYS", 1000),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_bucket_buffer():
+    """Write-behind buffer for the hourly/daily activity buckets, same switches."""
+    if not getattr(settings, "ACTIVITY_BUFFER", True):
+        return None
+    return ActivityBuffer(
+        activity_buckets_collection,
+        fields=("username", "period", "bucket"),
+        interval=getattr(settings, "ACTIVITY_FLUSH_INTERVAL", 5.0),
+        max_keys=getattr(settings, "ACTIVITY_FLUSH_MAX_KEYS", 1000),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_leaderboard():
+    """The in-process LeaderboardCache, or None when ACTIVITY_LEADERBOARD_CACHE_USERS is 0."""
+    size = getattr(settings, "ACTIVITY_LEADERBOARD_CACHE_USERS", 1000)
+    if not size:
+        return None
+    return LeaderboardCache(
+        maxsize=size,
+        ttl=getattr(settings, "ACTIVITY_LEADERBOARD_TTL", 60.0),
+        depth=getattr(settings, "ACTIVITY_LEADERBOARD_DEPTH", 100),
+    )
+
+
+def get_activity_graph(username):
+    """An ActivityGraph for username wired to the process-wide buffers and caches."""
+    return ActivityGraph(
+        activities_collection,
+        username,
+        buffer=get_activity_buffer(),
+        leaderboard=get_leaderboard(),
+        buckets=ActivityBuckets(activity_buckets_collection, buffer=get_bucket_buffer()),
+    )
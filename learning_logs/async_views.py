@@ -0,0 +1,59 @@
+"""
+Async versions of the JSON endpoints, routed instead of the sync ones when
+ASYNC_VIEWS is on (the ASGI deployment).
+
+Under ASGI, Django runs every sync view through one shared thread, so a
+single slow request holds up all the others. These views stay on the event
+loop. They only parse the request inline. The helper that does a request's
+pymongo calls is awaited on the bounded I/O pool, and MiniVader scoring runs
+on the CPU pool (see utils/offload.py). The helpers are the ones the sync
+views in views.py call, so both kinds of view give the same responses.
+"""
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+
+from .utils.json_stream import astream_array
+from .utils.offload import run_cpu, run_io
+from .views import (analyzer, create_entry, create_topic, entry_params, list_entries, list_topics,
+                    new_topic, summary_context, topic_param)
+
+
+async def add_topic(request):
+    topic, error = new_topic(request)
+    if error is not None:
+        return error
+    return await run_io(create_topic, topic)
+
+
+async def get_topics(request):
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "Not logged in"}, status=401)
+    return await run_io(list_topics, request, username)
+
+
+async def add_entry(request):
+    params, error = entry_params(request)
+    if error is not None:
+        return error
+    topic_obj_id, entry_text, username = params
+
+    senti = await run_cpu(analyzer.analyze, entry_text)
+    return await run_io(create_entry, topic_obj_id, entry_text, username, senti)
+
+
+def _astream_response(cursor):
+    return StreamingHttpResponse(astream_array(cursor, run_io), content_type="application/json")
+
+
+async def get_entries(request):
+    topic_obj_id, error = topic_param(request)
+    if error is not None:
+        return error
+    return await run_io(list_entries, request, topic_obj_id, _astream_response)
+
+
+async def summ(request, topic_id):
+    # only reads the cache; LexRank itself runs on the summary worker
+    context = await run_io(summary_context, topic_id)
+    return render(request, "learning_logs/summary.html", context)
@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+from .mongo_client import entry_signatures_collection
+from .sentiment import get_analyzer
+from .utils.dedupe import MIN_SHINGLES, Deduper
+
+
+def dedupe_mode():
+    """"off", "flag" (store with duplicate_of) or "reject" (refuse the entry)."""
+    return getattr(settings, "DEDUPE_MODE", "flag")
+
+
+@lru_cache(maxsize=None)
+def get_deduper():
+    """The near-duplicate detector for new entries, or None when DEDUPE_MODE is "off"."""
+    if dedupe_mode() == "off":
+        return None
+    return Deduper(entry_signatures_collection, get_analyzer(),
+                   threshold=getattr(settings, "DEDUPE_THRESHOLD", 0.8),
+                   min_shingles=getattr(settings, "DEDUPE_MIN_SHINGLES", MIN_SHINGLES))
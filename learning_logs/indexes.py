@@ -0,0 +1,93 @@
+"""
+Mongo indexes the views rely on, and the queries they are meant to serve.
+
+`manage.py ensure_indexes` creates INDEXES. `manage.py ensure_indexes --check`
+then explains every entry in QUERIES and fails if any would scan a whole
+collection. When a view gains a new query, add it to QUERIES here.
+"""
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+INDEXES = {
+    "users": [
+        IndexModel([("username", ASCENDING)], unique=True, name="username_unique"),
+    ],
+    "topics": [
+        IndexModel([("username", ASCENDING), ("_id", ASCENDING)], name="username_id"),
+    ],
+    "entries": [
+        IndexModel([("topic_id", ASCENDING), ("_id", ASCENDING)], name="topic_id_id"),
+        IndexModel([("username", ASCENDING), ("_id", ASCENDING)], name="username_id"),
+    ],
+    "activities": [
+        IndexModel([("username", ASCENDING), ("topic", ASCENDING)], unique=True, name="username_topic_unique"),
+        IndexModel([("username", ASCENDING), ("count", DESCENDING)], name="username_count"),
+    ],
+    "summaries": [
+        IndexModel([("topic_id", ASCENDING)], unique=True, name="topic_id_unique"),
+    ],
+    "activity_buckets": [
+        IndexModel([("username", ASCENDING), ("period", ASCENDING), ("bucket", ASCENDING)],
+                   unique=True, name="username_period_bucket_unique"),
+    ],
+    "search_postings": [
+        IndexModel([("username", ASCENDING), ("term", ASCENDING), ("entry_id", ASCENDING)],
+                   unique=True, name="username_term_entry_unique"),
+    ],
+    "search_stats": [
+        IndexModel([("username", ASCENDING)], unique=True, name="username_unique"),
+    ],
+    "entry_signatures": [
+        IndexModel([("username", ASCENDING), ("bk", ASCENDING)], name="username_band_keys"),
+    ],
+    "sentiment_daily": [
+        IndexModel([("username", ASCENDING), ("day", ASCENDING)], unique=True, name="username_day_unique"),
+    ],
+}
+
+_user = "index-check"
+_oid = ObjectId()
+
+# (label, collection, filter, sort) for every query the views issue
+QUERIES = [
+    ("get_topics", "topics", {"username": _user}, None),
+    ("get_topics page", "topics", {"username": _user, "_id": {"$gt": _oid}}, [("_id", ASCENDING)]),
+    ("add_entry topic lookup", "topics", {"_id": _oid}, None),
+    ("bulk import topic check", "topics", {"_id": {"$in": [_oid]}, "username": _user}, None),
+    ("get_entries", "entries", {"topic_id": _oid}, None),
+    ("get_entries page", "entries", {"topic_id": _oid, "_id": {"$gt": _oid}}, [("_id", ASCENDING)]),
+    ("summary entries", "entries", {"topic_id": _oid}, None),
+    ("login / register user lookup", "users", {"username": _user}, None),
+    ("add_activity upsert", "activities", {"username": _user, "topic": "t"}, None),
+    ("sorted_topics / most_active", "activities", {"username": _user}, [("count", DESCENDING)]),
+    ("least_active", "activities", {"username": _user}, [("count", ASCENDING)]),
+    ("activity bucket upsert", "activity_buckets", {"username": _user, "period": "hour", "bucket": "2024-01-01T00"},
+     None),
+    ("activity heatmap", "activity_buckets", {"username": _user, "period": "hour", "bucket": {"$gte": "2024-01-01"}},
+     None),
+    ("stale-while-revalidate summary", "summaries", {"topic_id": _oid}, None),
+    ("search postings", "search_postings", {"username": _user, "term": {"$in": ["a", "b"]}}, None),
+    ("search postings filtered", "search_postings",
+     {"username": _user, "term": {"$in": ["a", "b"]}, "topic_id": _oid, "sentiment": "positive"}, None),
+    ("search stats", "search_stats", {"username": _user}, None),
+    ("near-duplicate candidates", "entry_signatures", {"username": _user, "bk": {"$in": ["0:a", "1:b"]}}, None),
+    ("summary entries without duplicates", "entries", {"topic_id": _oid, "duplicate_of": {"$exists": False}}, None),
+    ("dedupe_report one user", "entries", {"username": _user}, [("username", ASCENDING), ("_id", ASCENDING)]),
+    ("dedupe_report all users", "entries", {"username": {"$ne": None}},
+     [("username", ASCENDING), ("_id", ASCENDING)]),
+    ("add_entry rollup upsert", "sentiment_daily", {"username": _user, "day": "2024-01-01"}, None),
+    ("sentiment_trend", "sentiment_daily", {"username": _user, "day": {"$gte": "2024-01-01"}},
+     [("day", ASCENDING)]),
+]
+
+
+def plan_stages(plan):
+    """Every 'stage' name anywhere in an explain() document."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from plan_stages(value)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from learning_logs.mongo_client import entries_collection, rollups_collection
+from learning_logs.utils.rollups import rollup_pipeline
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user daily sentiment rollups from the stored entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Only rebuild this user's rollups.")
+
+    def handle(self, *args, **options):
+        match = {"username": options["username"]} if options["username"] else None
+        # $merge on (username, day) needs the unique index from ensure_indexes
+        entries_collection.aggregate(rollup_pipeline(rollups_collection.name, match), allowDiskUse=True)
+        days = rollups_collection.count_documents(match or {})
+        self.stdout.write(self.style.SUCCESS(f"Rollups rebuilt: {days} user-days."))
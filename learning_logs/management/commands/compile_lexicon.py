@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from learning_logs.utils.lexicon_store import compile_lexicon, load_lexicon_text, MappedLexicon
+
+
+class Command(BaseCommand):
+    help = "Compile a term<TAB>valence lexicon source into the mmap-able binary format."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Lexicon source file (e.g. vader_lexicon.txt).")
+        parser.add_argument("output", help="Where to write the compiled lexicon (e.g. lexicon.mvlx).")
+
+    def handle(self, *args, **options):
+        try:
+            lexicon = load_lexicon_text(options["source"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        version = compile_lexicon(lexicon, options["output"])
+
+        # reopen the artifact and make sure every term reads back unchanged
+        mapped = MappedLexicon(options["output"])
+        try:
+            if len(mapped) != len(lexicon) or any(mapped.get(t) != v for t, v in lexicon.items()):
+                raise CommandError("Compiled lexicon does not match its source.")
+        finally:
+            mapped.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {len(lexicon)} terms to {options['output']} (version {version})"
+        ))
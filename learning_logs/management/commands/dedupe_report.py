@@ -0,0 +1,117 @@
+import time
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from learning_logs.dedupe import get_deduper
+from learning_logs.mongo_client import entries_collection, entry_signatures_collection, topics_collection
+from learning_logs.sentiment import get_analyzer
+from learning_logs.utils.dedupe import BandIndex, Deduper, band_keys
+
+# duplicates listed under each printed cluster
+SHOW_MEMBERS = 5
+
+
+class Command(BaseCommand):
+    help = ("Report clusters of near-duplicate entries per user. Candidates come from MinHash "
+            "band keys, so each entry is only compared with cluster representatives sharing a band.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Only check this user's entries.")
+        parser.add_argument("--threshold", type=float,
+                            help="Similarity to count as a duplicate (defaults to DEDUPE_THRESHOLD).")
+        parser.add_argument("--store", action="store_true",
+                            help="Also rebuild the stored signatures (one per cluster) that add_entry checks against.")
+        parser.add_argument("--mark", action="store_true",
+                            help="Set duplicate_of on every entry that repeats an earlier one.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Entries per cursor batch and per bulk_write.")
+        parser.add_argument("--show", type=int, default=20, help="Clusters to print (0 for none).")
+
+    def handle(self, *args, **options):
+        deduper = get_deduper()
+        if deduper is None:
+            deduper = Deduper(entry_signatures_collection, get_analyzer())
+        threshold = options["threshold"] if options["threshold"] is not None else deduper.threshold
+        query = {"username": options["username"]} if options["username"] else {"username": {"$ne": None}}
+        if options["store"]:
+            entry_signatures_collection.delete_many({"username": options["username"]} if options["username"] else {})
+
+        # served by the (username, _id) index, so the sort never runs in memory
+        cursor = (entries_collection.find(query, {"username": 1, "topic_id": 1, "text": 1, "duplicate_of": 1})
+                  .sort([("username", 1), ("_id", 1)])
+                  .batch_size(options["batch_size"]))
+        start = time.perf_counter()
+        self.options = options
+        self.stats = {"entries": 0, "compared": 0, "duplicates": 0, "clusters": 0}
+        self.shown = 0
+        self.signature_ops, self.mark_ops, self.marked_topics = [], [], set()
+
+        user, index, clusters = None, None, {}
+        for entry in cursor:
+            if entry["username"] != user:
+                if user is not None:
+                    self.report(user, clusters)
+                user = entry["username"]
+                # only each cluster's first entry (its representative) is kept
+                index = BandIndex(threshold, deduper.max_candidates)
+                clusters = {}   # representative id -> [text, topic_id, duplicates, sample]
+            self.stats["entries"] += 1
+            sig = deduper.signature(entry.get("text"))
+            if sig is None:
+                continue
+            keys = band_keys(sig)
+            match = index.match(sig, keys)
+            self.stats["compared"] += 1
+            if match is None:
+                index.add(entry["_id"], sig, keys)
+                clusters[entry["_id"]] = [(entry.get("text") or "")[:60], entry.get("topic_id"), 0, []]
+                if options["store"]:
+                    self.signature_ops.append(deduper.insert_op(
+                        {"_id": entry["_id"], "username": user, "topic_id": entry.get("topic_id")}, sig))
+            else:
+                cluster = clusters[match[0]]
+                cluster[2] += 1
+                if len(cluster[3]) < SHOW_MEMBERS:
+                    cluster[3].append((entry["_id"], match[1], (entry.get("text") or "")[:60]))
+                if options["mark"] and entry.get("duplicate_of") != match[0]:
+                    self.mark_ops.append(UpdateOne({"_id": entry["_id"]}, {"$set": {"duplicate_of": match[0]}}))
+                    self.marked_topics.add(entry.get("topic_id"))
+            self.flush()
+        if user is not None:
+            self.report(user, clusters)
+        self.flush(force=True)
+
+        elapsed = time.perf_counter() - start
+        stats = self.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['entries']} entries, {stats['compared']} signatures matched, "
+            f"{stats['duplicates']} duplicates in {stats['clusters']} clusters ({elapsed:.1f}s)."))
+
+    def flush(self, force=False):
+        """Write pending signatures and marks once a batch is full (or when forced)."""
+        batch_size = self.options["batch_size"]
+        if self.signature_ops and (force or len(self.signature_ops) >= batch_size):
+            entry_signatures_collection.bulk_write(self.signature_ops, ordered=False)
+            self.signature_ops = []
+        if self.mark_ops and (force or len(self.mark_ops) >= batch_size):
+            entries_collection.bulk_write(self.mark_ops, ordered=False)
+            # summaries leave out duplicates, so the cached ones for these topics are stale
+            topics_collection.update_many({"_id": {"$in": list(self.marked_topics - {None})}},
+                                          {"$inc": {"version": 1}})
+            self.mark_ops, self.marked_topics = [], set()
+
+    def report(self, username, clusters):
+        """Count one user's clusters and print the largest, up to --show in total."""
+        found = [(rep_id, cluster) for rep_id, cluster in clusters.items() if cluster[2]]
+        self.stats["clusters"] += len(found)
+        self.stats["duplicates"] += sum(cluster[2] for _, cluster in found)
+
+        for rep_id, (text, _, duplicates, sample) in sorted(found, key=lambda item: item[1][2], reverse=True):
+            if self.shown >= self.options["show"]:
+                break
+            self.stdout.write(f"{username}: {duplicates + 1} entries like {rep_id} {text!r}")
+            for entry_id, score, member_text in sample:
+                self.stdout.write(f"    {entry_id}  {score:.2f}  {member_text!r}")
+            if duplicates > len(sample):
+                self.stdout.write(f"    ... and {duplicates - len(sample)} more")
+            self.shown += 1
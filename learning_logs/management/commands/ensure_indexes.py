@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from pymongo.errors import OperationFailure
+
+from learning_logs.indexes import INDEXES, QUERIES, plan_stages
+from learning_logs.mongo_client import db
+
+
+class Command(BaseCommand):
+    help = "Create the Mongo indexes the views need (idempotent)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="Afterwards explain() every view query and fail on any COLLSCAN.")
+
+    def handle(self, *args, **options):
+        for name, indexes in INDEXES.items():
+            try:
+                created = db[name].create_indexes(indexes)
+            except OperationFailure as exc:
+                raise CommandError(f"{name}: could not create indexes: {exc}")
+            self.stdout.write(f"{name}: {', '.join(created)}")
+
+        if not options["check"]:
+            self.stdout.write(self.style.SUCCESS("Indexes are in place."))
+            return
+
+        scans = []
+        for label, collection, query, sort in QUERIES:
+            cursor = db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            stages = set(plan_stages(cursor.explain().get("queryPlanner", {}).get("winningPlan", {})))
+            self.stdout.write(f"  {label:<32} {', '.join(sorted(stages))}")
+            if "COLLSCAN" in stages:
+                scans.append(label)
+
+        if scans:
+            raise CommandError(f"COLLSCAN in: {', '.join(scans)}")
+        self.stdout.write(self.style.SUCCESS("Every view query is served by an index."))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning_logs.indexes import INDEXES
+from learning_logs.mongo_client import entries_collection
+from learning_logs.search import get_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the stored entries, without an empty window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Only rebuild this user's index.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Entries per cursor batch and per bulk_write.")
+
+    def handle(self, *args, **options):
+        index = get_search_index()
+        if index is None:
+            raise CommandError("SEARCH_INDEX is off.")
+
+        batch_size = options["batch_size"]
+        # entries saved before usernames were recorded cannot be searched
+        scope = {"username": options["username"]} if options["username"] else {"username": {"$nin": [None, ""]}}
+
+        def load(after_id):
+            query = dict(scope)
+            if after_id is not None:
+                query["_id"] = {"$gt": after_id}
+            return (entries_collection.find(query, {"username": 1, "text": 1, "topic_id": 1, "sentiment": 1})
+                    .sort("_id", 1)
+                    .batch_size(batch_size))
+
+        start = time.perf_counter()
+        done = index.rebuild(load, username=options["username"], batch_size=batch_size, indexes=INDEXES,
+                             progress=lambda n: self.stdout.write(f"{n} entries indexed"))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Indexed {done} entries in {elapsed:.1f}s."))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from learning_logs.mongo_client import entries_collection, topics_collection, users_collection
+from learning_logs.utils.conditional import bump_user_stamps
+from learning_logs.utils.topic_stats import stats_pipeline
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized per-topic entry counters and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        actual = {}
+        for row in entries_collection.aggregate(stats_pipeline(), allowDiskUse=True):
+            row["neutral"] = row["entries"] - row["positive"] - row["negative"]
+            actual[row.pop("_id")] = row
+
+        empty = {"entries": 0, "score_sum": 0.0, "positive": 0, "negative": 0, "neutral": 0,
+                 "last_entry_at": None}
+        checked = drifted = 0
+        ops = []
+        users = set()
+        for topic in topics_collection.find({}, {"stats": 1, "username": 1}):
+            checked += 1
+            want = actual.pop(topic["_id"], empty)
+            have = topic.get("stats") or {}
+            if all(_same(have.get(k), v) for k, v in want.items()):
+                continue
+            drifted += 1
+            users.add(topic.get("username"))
+            # only /topics/ shows the stats, so the user's stamp is bumped below; the
+            # topic's entry listing and its cached summary are unaffected
+            ops.append(UpdateOne({"_id": topic["_id"]}, {"$set": {"stats": want}}))
+            if len(ops) >= options["batch_size"] and not options["dry_run"]:
+                topics_collection.bulk_write(ops, ordered=False)
+                ops = []
+
+        if ops and not options["dry_run"]:
+            topics_collection.bulk_write(ops, ordered=False)
+        if not options["dry_run"]:
+            bump_user_stamps(users_collection, users - {None})   # /topics/ shows the stats
+
+        verb = "would be repaired" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} topics, {drifted} {verb}; "
+            f"{len(actual)} topic ids in entries have no topic document."
+        ))
+
+
+def _same(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and abs(a - b) < 1e-9
+    return a == b
@@ -0,0 +1,126 @@
+import time
+from collections import defaultdict, deque
+
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from learning_logs.mongo_client import (entries_collection, checkpoints_collection, rollups_collection,
+                                        topics_collection, users_collection)
+from learning_logs.sentiment import get_analyzer
+from learning_logs.utils.conditional import bump_user_stamps
+from learning_logs.utils.rollups import rescore_rollup_updates
+from learning_logs.utils.topic_stats import rescore_update
+
+JOB_ID = "rescore_entries"
+
+
+class Command(BaseCommand):
+    help = "Re-score stored entries with the current MiniVader lexicon (resumable)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Entries per cursor batch and per bulk_write.")
+        parser.add_argument("--processes", type=int, default=0,
+                            help="Score on a process pool of this size (0 = in-process).")
+        parser.add_argument("--stale-only", action="store_true",
+                            help="Only re-score entries whose lexicon_version is out of date.")
+        parser.add_argument("--restart", action="store_true",
+                            help="Ignore any saved checkpoint and start from the first entry.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        analyzer = get_analyzer()
+        version = analyzer.lexicon_version
+
+        checkpoint = None if options["restart"] else checkpoints_collection.find_one({"_id": JOB_ID})
+        if checkpoint and checkpoint.get("lexicon_version") != version:
+            checkpoint = None  # lexicon changed since the interrupted run, start over
+
+        query = {}
+        if checkpoint:
+            query["_id"] = {"$gt": checkpoint["last_id"]}
+            self.stdout.write(f"Resuming after {checkpoint['last_id']} "
+                              f"({checkpoint.get('done', 0)} entries already done)")
+        if options["stale_only"]:
+            query["lexicon_version"] = {"$ne": version}
+
+        projection = {"_id": 1, "text": 1, "topic_id": 1, "username": 1, "sentiment": 1, "score": 1,
+                      "date_added": 1}
+        cursor = (entries_collection.find(query, projection)
+                  .sort("_id", 1)
+                  .batch_size(batch_size))
+
+        pending = deque()
+        # (old, new) label/score pairs of the entries whose result changed, per topic
+        changes = defaultdict(list)
+        touched_users = set()
+
+        def texts():
+            for doc in cursor:
+                pending.append(doc)
+                yield doc.get("text") or ""
+
+        done = checkpoint.get("done", 0) if checkpoint else 0
+        scored = 0
+        ops = []
+        last_id = None
+        start = time.perf_counter()
+
+        def flush():
+            nonlocal done, scored
+            entries_collection.bulk_write(ops, ordered=False)
+            # keep the topic counters and day rollups in step with the new labels.
+            # The topic update also bumps the topics' stamps, and the users' stamps
+            # cover /topics/, so conditional GETs and cached listing bodies do not
+            # answer 304 for them. If the run dies between the writes,
+            # reconcile_topic_stats and backfill_rollups repair them.
+            topic_ops = [UpdateOne({"_id": topic_id}, rescore_update(pairs))
+                         for topic_id, pairs in changes.items() if topic_id is not None]
+            if topic_ops:
+                topics_collection.bulk_write(topic_ops, ordered=False)
+            rollup_ops = rescore_rollup_updates(
+                pair for pairs in changes.values() for pair in pairs
+                if pair[0].get("username") and pair[0].get("date_added"))
+            if rollup_ops:
+                rollups_collection.bulk_write(rollup_ops, ordered=False)
+            bump_user_stamps(users_collection, touched_users - {None})
+            changes.clear()
+            touched_users.clear()
+            done += len(ops)
+            scored += len(ops)
+            checkpoints_collection.update_one(
+                {"_id": JOB_ID},
+                {"$set": {"last_id": last_id, "lexicon_version": version, "done": done}},
+                upsert=True,
+            )
+            ops.clear()
+            rate = scored / (time.perf_counter() - start)
+            self.stdout.write(f"{done} entries re-scored ({rate:.0f} entries/s)")
+
+        for senti in analyzer.analyze_many(texts(), processes=options["processes"],
+                                           chunksize=max(1, batch_size // 4)):
+            doc = pending.popleft()
+            last_id = doc["_id"]
+            new = {"sentiment": senti["label"], "score": senti["compound"]}
+            if (doc.get("sentiment"), doc.get("score")) != (new["sentiment"], new["score"]):
+                changes[doc.get("topic_id")].append((doc, new))
+                touched_users.add(doc.get("username"))
+            ops.append(UpdateOne(
+                {"_id": last_id},
+                {"$set": {
+                    "sentiment": senti["label"],
+                    "score": senti["compound"],
+                    "lexicon_version": version,
+                }},
+            ))
+            if len(ops) >= batch_size:
+                flush()
+        if ops:
+            flush()
+
+        checkpoints_collection.delete_one({"_id": JOB_ID})
+        elapsed = time.perf_counter() - start
+        rate = scored / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {scored} entries in {elapsed:.1f}s ({rate:.0f} entries/s), lexicon {version}"
+        ))
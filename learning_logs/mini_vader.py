@@ -1,8 +1,27 @@
 import re
 import math
-from collections import defaultdict
+import hashlib
+from collections import defaultdict, deque
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# patterns are compiled once at import instead of on every call in the hot loop
+_TOKEN_RE = re.compile(r"\w+|[!?.]+|[\u2600-\u27BF\u1F300-\u1F6FF\u1F900-\u1F9FF]+")
+_WORD_RE = re.compile(r"\w+")
+_PUNCT_RE = re.compile(r"[!?.]+")
+_BUT_RE = re.compile(r"\bbut\b", re.IGNORECASE)
+
+# marks the end of a phrase inside the token trie
+_PHRASE_END = ""
 
 class MiniVader:
+    __slots__ = (
+        "lexicon", "intensifiers", "negations", "emoji_lexicon",
+        "exclam_boost", "question_boost", "caps_boost", "max_phrase_len",
+        "_phrase_trie", "_frozen", "_version",
+    )
+
     def __init__(self, lexicon=None):
         # sample lexicon, now supports multiword phrases in lowercase
         self.lexicon = lexicon or {
@@ -34,9 +53,86 @@ class MiniVader:
         self.question_boost = 0.1
         self.caps_boost = 1.5
         self.max_phrase_len = 3   # ✅ sliding window 1-gram, 2-gram, 3-gram
+        # built by freeze(): a mutable lexicon can change under a prebuilt trie
+        self._phrase_trie = None
+
+    def _compile_phrases(self):
+        """
+        Build a token trie over the multi-word lexicon entries so phrase
+        lookups walk the tokens once instead of joining and probing strings.
+        """
+        trie = {}
+        for phrase in self.lexicon:
+            words = phrase.split(" ")
+            if len(words) < 2 or len(words) > self.max_phrase_len or "" in words:
+                continue  # single words and over-long phrases can never match
+            node = trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_PHRASE_END] = phrase
+        return trie
+
+    @property
+    def lexicon_version(self):
+        """
+        Short digest of every scoring table and constant. Frozen analyzers
+        compute it once; mutable ones recompute it on each access so in-place
+        lexicon edits are always reflected.
+        """
+        version = getattr(self, "_version", None)
+        if version is not None:
+            return version
+        digest = hashlib.blake2b(digest_size=8)
+        # compiled lexicons carry their own hash, so they are never re-walked
+        lexicon_hash = getattr(self.lexicon, "version", None)
+        if lexicon_hash is None:
+            lexicon_hash = repr(sorted(self.lexicon.items()))
+        digest.update(lexicon_hash.encode("utf-8"))
+        for table in (self.intensifiers, self.emoji_lexicon):
+            digest.update(repr(sorted(table.items())).encode("utf-8"))
+        digest.update(repr(sorted(self.negations)).encode("utf-8"))
+        digest.update(repr((self.exclam_boost, self.question_boost,
+                            self.caps_boost, self.max_phrase_len)).encode("utf-8"))
+        version = digest.hexdigest()
+        if getattr(self, "_frozen", False):
+            object.__setattr__(self, "_version", version)
+        return version
+
+    def freeze(self):
+        """
+        Make the analyzer immutable: tables become read-only mappings and any
+        further attribute assignment raises. Returns self for chaining.
+        """
+        if isinstance(self.lexicon, dict):
+            self.lexicon = MappingProxyType(dict(self.lexicon))  # compiled lexicons are already read-only
+        self.intensifiers = MappingProxyType(dict(self.intensifiers))
+        self.negations = frozenset(self.negations)
+        self.emoji_lexicon = MappingProxyType(dict(self.emoji_lexicon))
+        self._phrase_trie = self._compile_phrases()
+        self._frozen = True
+        return self
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} is frozen; build a new analyzer instead")
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # mapping proxies don't pickle, so ship plain copies and re-freeze on load
+        state = {}
+        for name in self.__slots__:
+            if name == "_version":
+                continue
+            value = getattr(self, name, None)
+            if isinstance(value, MappingProxyType):
+                value = dict(value)
+            elif isinstance(value, frozenset):
+                value = set(value)
+            state[name] = value
+        return _restore_analyzer, (type(self), state)
 
     def _tokenize(self, text):
-        return re.findall(r"\w+|[!?.]+|[\u2600-\u27BF\u1F300-\u1F6FF\u1F900-\u1F9FF]+", text)
+        return _TOKEN_RE.findall(text)
 
     def _count_exclamation_question(self, text):
         return text.count('!'), text.count('?')
@@ -53,15 +149,45 @@ class MiniVader:
 
     def _match_phrase(self, tokens, i):
         """
-        Sliding window matcher: tries 3-gram, then 2-gram, ignores punctuation,
-        returns (phrase, length) or (None, 1)
+        Sliding window matcher: walks the phrase trie from token i, ignores
+        punctuation, returns the shortest 2+ word phrase as (phrase, length)
+        or (None, 1). Mutable analyzers have no trie and probe the lexicon.
+        """
+        node = self._phrase_trie
+        if node is None:
+            return self._scan_phrase(tokens, i)
+        idx = i
+        used = 0
+
+        while idx < len(tokens) and used < self.max_phrase_len:
+            token = tokens[idx]
+            if not _WORD_RE.match(token):  # skip punctuation/emojis in phrase build
+                idx += 1
+                continue
+
+            node = node.get(token.lower())
+            if node is None:
+                break  # no lexicon phrase continues with this word
+            used += 1
+
+            if used > 1 and _PHRASE_END in node:  # only accept 2+ words as phrase
+                return node[_PHRASE_END], idx - i + 1
+
+            idx += 1
+
+        return None, 1  # no phrase match → process normally as 1 token
+
+    def _scan_phrase(self, tokens, i):
+        """
+        Same matching as _match_phrase, but joins and probes the lexicon on
+        every call, so in-place edits of a mutable lexicon take effect at once.
         """
         phrase_tokens = []
         idx = i
         used = 0
 
         while idx < len(tokens) and used < self.max_phrase_len:
-            if not re.match(r"\w+", tokens[idx]):  # skip punctuation/emojis in phrase build
+            if not _WORD_RE.match(tokens[idx]):
                 idx += 1
                 continue
 
@@ -69,12 +195,12 @@ class MiniVader:
             used += 1
             phrase = " ".join(phrase_tokens)
 
-            if phrase in self.lexicon and used > 1:  # only accept 2+ words as phrase
+            if phrase in self.lexicon and used > 1:
                 return phrase, idx - i + 1
 
             idx += 1
 
-        return None, 1  # no phrase match → process normally as 1 token
+        return None, 1
 
     def analyze(self, text):
         if not text or not text.strip():
@@ -93,7 +219,7 @@ class MiniVader:
 
         # handle "but" clauses
         if " but " in orig_text.lower():
-            parts = re.split(r"\bbut\b", orig_text, flags=re.IGNORECASE)
+            parts = _BUT_RE.split(orig_text)
             first = parts[0].strip()
             second = parts[1].strip() if len(parts) > 1 else ""
             score_first = self._score_plain(first)
@@ -130,7 +256,7 @@ class MiniVader:
                 continue
 
             # punctuation
-            if re.fullmatch(r"[!?.]+", token):
+            if _PUNCT_RE.fullmatch(token):
                 i += 1
                 continue
 
@@ -189,6 +315,28 @@ class MiniVader:
         label = "positive" if compound > 0.05 else "negative" if compound < -0.05 else "neutral"
         return {"compound": compound, "label": label, "pos": pos_score, "neg": neg_score, "neu": neu_count}
 
+    def analyze_many(self, texts, processes=None, chunksize=256):
+        """
+        Score an iterable of texts, yielding one analyze() result per text in
+        input order. With processes > 1 the analyzer (lexicon and phrase trie)
+        is pickled once into each worker and texts are scored in chunks.
+        """
+        if not processes or processes <= 1:
+            for text in texts:
+                yield self.analyze(text)
+            return
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(self,)) as pool:
+            pending = deque()
+            for chunk in _chunks(texts, chunksize):
+                pending.append(pool.submit(_analyze_chunk, chunk))
+                # keep a couple of chunks per worker in flight so the input is streamed
+                if len(pending) >= processes * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
     def _score_plain(self, text):
         tokens = self._tokenize(text)
         i = 0
@@ -213,7 +361,7 @@ class MiniVader:
                 raw_score += self.emoji_lexicon[token]
                 i += 1
                 continue
-            if re.fullmatch(r"[!?.]+", token):
+            if _PUNCT_RE.fullmatch(token):
                 i += 1
                 continue
             if lower_token in self.negations:
@@ -234,3 +382,34 @@ class MiniVader:
         raw_score *= (1.0 + min(ex_count, 4) * self.exclam_boost +
                       min(q_count, 4) * self.question_boost)
         return raw_score
+
+
+def _restore_analyzer(cls, state):
+    analyzer = cls.__new__(cls)
+    frozen = state.pop("_frozen", False)
+    for name, value in state.items():
+        object.__setattr__(analyzer, name, value)
+    return analyzer.freeze() if frozen else analyzer
+
+
+# ---- process pool helpers for MiniVader.analyze_many ----
+
+_worker_analyzer = None
+
+
+def _init_worker(analyzer):
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_chunk(texts):
+    return [_worker_analyzer.analyze(text) for text in texts]
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
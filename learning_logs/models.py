@@ -1,5 +1,5 @@
 from django.db import models
-from .mini_vader import MiniVader   
+from .sentiment import get_scorer
 
 class Topic(models.Model):
     """A topic the user is learning about."""
@@ -32,8 +32,7 @@ class Entry(models.Model):
     sentiment = models.CharField(max_length=20, default='neutral')  # positive / negative / neutral
 
     def save(self, *args, **kwargs):
-        analyzer = MiniVader()
-        self.sentiment = analyzer.analyze(self.text)  # returns label like "positive"
+        self.sentiment = get_scorer().analyze(self.text)["label"]  # label like "positive"
         super().save(*args, **kwargs)
 
     def __str__(self):
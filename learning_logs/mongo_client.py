@@ -1,19 +1,223 @@
-from pymongo import MongoClient
+"""
+The app's single MongoDB connection point.
 
-# Connect to local MongoDB
-client = MongoClient("mongodb://localhost:27017/")
+Nothing connects at import time. The client is built from Django settings on
+first use. A forked worker builds its own client the first time it touches
+the database, so it never reuses sockets or monitor threads from a preloaded
+parent. The module-level collections are light proxies that resolve the
+current process's collection on every call, so
+`from .mongo_client import entries_collection` stays safe everywhere.
+"""
+import os
+import threading
+import time
 
-# Choose your database
-db = client["learning_log"]
+from django.conf import settings
+from pymongo import MongoClient, monitoring
 
-# Example collection
-collection = db["test_collection"]
-topics_collection = db["topics"]
-entries_collection = db["entries"]
-from pymongo import MongoClient
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_collections = {}
 
-users_collection = db["users"]
-topics_collection = db["topics"]
-entries_collection = db["entries"]
 
-activities_collection = db["activities"]
\ No newline at end of file
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters, fed by pymongo's CMAP events."""
+
+    # a checkout slower than this is counted as having waited for a connection
+    WAIT_THRESHOLD_S = 0.001
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checked_out = 0
+            self.waits = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pool_clears = 0
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._started, "at", time.perf_counter())
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            if waited > self.WAIT_THRESHOLD_S:
+                self.waits += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checked_out": self.checked_out,
+                "waits": self.waits,
+                "avg_checkout_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_checkout_ms": self.wait_max * 1000,
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_created": self.connections_created,
+                "pool_clears": self.pool_clears,
+            }
+
+
+pool_stats = PoolStats()
+
+
+def _client_options():
+    options = {
+        "maxPoolSize": getattr(settings, "MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": getattr(settings, "MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": getattr(settings, "MONGO_MAX_IDLE_TIME_MS", None),
+        "connectTimeoutMS": getattr(settings, "MONGO_CONNECT_TIMEOUT_MS", 20000),
+        "serverSelectionTimeoutMS": getattr(settings, "MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000),
+        "socketTimeoutMS": getattr(settings, "MONGO_SOCKET_TIMEOUT_MS", None),
+        "waitQueueTimeoutMS": getattr(settings, "MONGO_WAIT_QUEUE_TIMEOUT_MS", None),
+        "compressors": getattr(settings, "MONGO_COMPRESSORS", None),
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def get_client():
+    """Return this process's MongoClient, creating it on first use."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                # a client inherited across fork is simply dropped, never used or closed here
+                _collections.clear()
+                pool_stats.reset()
+                _client = MongoClient(
+                    getattr(settings, "MONGO_URI", "mongodb://localhost:27017/"),
+                    connect=False,
+                    event_listeners=[pool_stats],
+                    **_client_options(),
+                )
+                _client_pid = pid
+    return _client
+
+
+def use_client(client):
+    """Swap in another client (e.g. mongomock for benchmarks) for this process."""
+    global _client, _client_pid
+    with _lock:
+        _collections.clear()
+        _client = client
+        _client_pid = os.getpid()
+
+
+def get_db():
+    return get_client()[getattr(settings, "MONGO_DB_NAME", "learning_log")]
+
+
+def get_collection(name):
+    db = get_db()  # resolves (and if needed rebuilds) the client first
+    collection = _collections.get(name)
+    if collection is None:
+        collection = _collections[name] = db[name]
+    return collection
+
+
+class LazyCollection:
+    """Module-level stand-in that forwards everything to the real collection."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_collection(self.name), attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
+
+
+class LazyDatabase:
+    def __getattr__(self, attr):
+        return getattr(get_db(), attr)
+
+    def __getitem__(self, name):
+        return get_collection(name)
+
+
+def health(details=False):
+    """
+    Ping the server and report pool statistics for this process. details
+    adds the driver error, the pid and the client options, which are only
+    meant for operators.
+    """
+    start = time.perf_counter()
+    try:
+        get_client().admin.command("ping")
+        ok, error = True, None
+    except Exception as exc:  # any driver error means unhealthy
+        ok, error = False, str(exc)
+    report = {
+        "ok": ok,
+        "ping_ms": (time.perf_counter() - start) * 1000,
+        "pool": pool_stats.snapshot(),
+    }
+    if details:
+        report.update(error=error, pid=os.getpid(), options=_client_options())
+    return report
+
+
+db = LazyDatabase()
+
+collection = LazyCollection("test_collection")
+users_collection = LazyCollection("users")
+topics_collection = LazyCollection("topics")
+entries_collection = LazyCollection("entries")
+activities_collection = LazyCollection("activities")
+checkpoints_collection = LazyCollection("checkpoints")
+summaries_collection = LazyCollection("summaries")
+rollups_collection = LazyCollection("sentiment_daily")
+activity_buckets_collection = LazyCollection("activity_buckets")
+search_postings_collection = LazyCollection("search_postings")
+search_stats_collection = LazyCollection("search_stats")
+entry_signatures_collection = LazyCollection("entry_signatures")
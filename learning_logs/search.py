@@ -0,0 +1,33 @@
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+
+from .mongo_client import search_postings_collection, search_stats_collection
+from .sentiment import get_analyzer
+from .utils.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_search_index():
+    """The entry search index, or None when SEARCH_INDEX is off."""
+    if not getattr(settings, "SEARCH_INDEX", True):
+        return None
+    return SearchIndex(search_postings_collection, search_stats_collection, get_analyzer())
+
+
+def index_entries(entries):
+    """
+    Add saved entries to the search index. The entries are already stored,
+    so a failure here is logged instead of failing the write;
+    rebuild_search_index picks up whatever was missed.
+    """
+    index = get_search_index()
+    if index is None:
+        return
+    try:
+        index.add(entries)
+    except Exception:
+        logger.exception("indexing %d entries for search failed", len(entries))
@@ -0,0 +1,58 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+from .mini_vader import MiniVader
+from .utils.lexicon_store import open_lexicon
+from .utils.sentiment_cache import SentimentCache
+
+
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """
+    Return the process-wide, frozen MiniVader shared by models and views.
+    SENTIMENT_LEXICON_PATH may point at a term<TAB>valence source or at a
+    lexicon compiled with `manage.py compile_lexicon`; by default the
+    built-in sample lexicon is used.
+    """
+    path = getattr(settings, "SENTIMENT_LEXICON_PATH", None)
+    lexicon = open_lexicon(path) if path else None
+    return MiniVader(lexicon).freeze()
+
+
+@lru_cache(maxsize=None)
+def get_scorer():
+    """
+    Return what callers should use to score text: the shared analyzer behind
+    an LRU result cache, or the bare analyzer when SENTIMENT_CACHE_SIZE is 0.
+    """
+    size = getattr(settings, "SENTIMENT_CACHE_SIZE", 2048)
+    if not size:
+        return get_analyzer()
+    return SentimentCache(get_analyzer(), maxsize=size)
+
+
+# texts scored with the corpus scorer before deciding which path the rest takes
+CORPUS_SAMPLE_SIZE = 500
+
+
+def score_batch(texts):
+    """
+    Score a list of texts in one go, one analyze()-shaped dict per text.
+    The NumPy corpus scorer only pays off when few texts fall back to the
+    scalar path, so it scores a sample first and keeps going only if at most
+    SENTIMENT_CORPUS_MAX_FALLBACK of it fell back. Without NumPy, or past
+    that rate, the analyzer scores the texts one by one.
+    """
+    texts = list(texts)
+    analyzer = get_analyzer()
+    try:
+        from .utils.vader_corpus import CorpusScorer
+    except ImportError:
+        return [analyzer.analyze(text) for text in texts]
+    scorer = CorpusScorer(analyzer)
+    results = scorer.analyze_corpus(texts[:CORPUS_SAMPLE_SIZE])
+    rest = texts[CORPUS_SAMPLE_SIZE:]
+    if scorer.last_fallback_rate > getattr(settings, "SENTIMENT_CORPUS_MAX_FALLBACK", 0.3):
+        return results + [analyzer.analyze(text) for text in rest]
+    return results + scorer.analyze_corpus(rest)
@@ -1,3 +1,73 @@
-from django.test import TestCase
+import random
 
-# Create your tests here.
+import mongomock
+from django.test import SimpleTestCase
+
+from . import mongo_client
+from .mini_vader import MiniVader
+from .sentiment import get_analyzer, score_batch
+from .utils.bulk_import import _validate, import_entries
+
+
+class MongomockTestCase(SimpleTestCase):
+    """Runs each test against a fresh in-memory mongomock database."""
+
+    def setUp(self):
+        mongo_client.use_client(mongomock.MongoClient())
+
+
+class BulkImportTests(MongomockTestCase):
+    def test_unpadded_date_is_normalised(self):
+        topic_id = mongo_client.topics_collection.insert_one({"text": "t", "username": "u"}).inserted_id
+        item = {"topic_id": str(topic_id), "text": "a fine day", "date_added": "2024-1-5 3:4:5"}
+        self.assertEqual(_validate(item)[2], "2024-01-05 03:04:05")
+
+        inserted, errors = import_entries([(0, item)], "u")
+        self.assertEqual((inserted, errors), (1, []))
+        entry = mongo_client.entries_collection.find_one({"topic_id": topic_id})
+        self.assertEqual(entry["date_added"], "2024-01-05 03:04:05")
+        rollup = mongo_client.rollups_collection.find_one({"username": "u"})
+        self.assertEqual(rollup["day"], "2024-01-05")
+
+
+def make_corpus(n_texts, seed=7):
+    """Random texts mixing lexicon phrases, negations, "but", caps, punctuation and emoji."""
+    rng = random.Random(seed)
+    words = [
+        "the", "movie", "was", "not", "good", "very", "really", "love", "kind", "of",
+        "bad", "at", "all", "GREAT", "terrible", "so", "sad", "but", "happy", "today",
+        "never", "excellent", "I", "it", "nice", "!", "?", "...", "😊", "😭", "NOT", "Good",
+    ]
+    phrases = ["not good", "very good", "really love", "kind of bad", "not at all good", "not, good"]
+    texts = []
+    for _ in range(n_texts):
+        parts = []
+        for _ in range(rng.randint(1, 40)):
+            parts.append(rng.choice(phrases) if rng.random() < 0.2 else rng.choice(words))
+        texts.append(" ".join(parts))
+    return texts + ["", "   ", "but", "not good but very good 😊", "It was okay, but the ending was AMAZING"]
+
+
+class MiniVaderTests(SimpleTestCase):
+    def test_trie_matches_lexicon_scan(self):
+        # a frozen analyzer matches phrases through its trie, a mutable one
+        # probes the lexicon like the original matcher
+        trie, scan = MiniVader().freeze(), MiniVader()
+        for text in make_corpus(3000):
+            self.assertEqual(trie.analyze(text), scan.analyze(text), text)
+
+    def test_mutable_lexicon_edits_take_effect(self):
+        analyzer = MiniVader()
+        before = analyzer.analyze("the movie was fine")
+        analyzer.lexicon["was fine"] = 2.0
+        self.assertEqual(before["label"], "neutral")
+        self.assertEqual(analyzer.analyze("the movie was fine")["label"], "positive")
+
+    def test_score_batch_matches_analyze(self):
+        analyzer = get_analyzer()
+        rng = random.Random(1)
+        unigrams = ["the", "movie", "was", "good", "sad", "GREAT", "nice", "!", "😊", "never", "happy"]
+        plain = [" ".join(rng.choice(unigrams) for _ in range(20)) for _ in range(1500)]
+        # the mixed corpus takes the scalar path after the sample, the unigram one stays vectorized
+        for texts in (make_corpus(1500), plain):
+            self.assertEqual(score_batch(texts), [analyzer.analyze(text) for text in texts])
@@ -1,13 +1,20 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    # the ASGI deployment serves the JSON endpoints from the event loop
+    from . import async_views as json_views
+else:
+    json_views = views
+
 urlpatterns = [
     # path('test/', views.test_view, name='test_view'),
-    path('add_topic/', views.add_topic, name='add_topic'),
-    path('topics/', views.get_topics, name='get_topics'),
+    path('add_topic/', json_views.add_topic, name='add_topic'),
+    path('topics/', json_views.get_topics, name='get_topics'),
 
-    path('add_entry/', views.add_entry, name='add_entry'),
-    path('entries/', views.get_entries, name='get_entries'),
+    path('add_entry/', json_views.add_entry, name='add_entry'),
+    path('entries/', json_views.get_entries, name='get_entries'),
     path('', views.topics_page, name='topics_page'),          # Home -> topics.html
     path('entries_page/', views.entries_page, name='entries_page'),
     path('topics_page/', views.topics_page, name='topics_page'),
@@ -19,10 +26,10 @@ urlpatterns = [
     path('register_page/', views.register_page, name='register_page'),
        path('', views.home, name='home'),
 
-    path('add_topic/', views.add_topic, name='add_topic'),
-    path('topics/', views.get_topics, name='get_topics'),
-    path('add_entry/', views.add_entry, name='add_entry'),
-    path('entries/', views.get_entries, name='get_entries'),
+    path('add_topic/', json_views.add_topic, name='add_topic'),
+    path('topics/', json_views.get_topics, name='get_topics'),
+    path('add_entry/', json_views.add_entry, name='add_entry'),
+    path('entries/', json_views.get_entries, name='get_entries'),
 
     path('topics_page/', views.topics_page, name='topics_page'),
     path('entries_page/', views.entries_page, name='entries_page'),
@@ -34,6 +41,14 @@ urlpatterns = [
     path('logout_user/', views.logout_user, name='logout_user'),
     # path("summ/<str:topic_id>/", views.summ, name="summ"),
     # path("summary/<str:topic_id>/", views.summ, name="summary"),
-    path("summary/<str:topic_id>/", views.summ, name="summary_page"),
+    path("summary/<str:topic_id>/", json_views.summ, name="summary_page"),
+    path("summary_stats/", views.summary_stats, name="summary_stats"),
+    path("activity_stats/", views.activity_stats, name="activity_stats"),
+    path("activity/leaderboard/", views.activity_leaderboard, name="activity_leaderboard"),
+    path("activity/heatmap/", views.activity_heatmap, name="activity_heatmap"),
+    path("search/", views.search_entries, name="search_entries"),
+    path("health/db/", views.db_health, name="db_health"),
+    path("trend/", views.sentiment_trend, name="sentiment_trend"),
+    path("entries/bulk/", views.bulk_add_entries, name="bulk_add_entries"),
 
 ]
@@ -0,0 +1,134 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """
+    Write-behind counter buffer. Increments are summed in memory by key (the
+    values of `fields`, e.g. (username, topic)) and written later as one
+    unordered bulk_write of `$inc` upserts. That happens every `interval`
+    seconds on a background thread, as soon as `max_keys` distinct keys are
+    pending, and once more at interpreter exit. A failed flush puts its
+    increments back, so they go out with the next one.
+
+    Counts still buffered when a process dies without running atexit are
+    lost. That trade-off is fine for page-view activity, not for data.
+    """
+
+    def __init__(self, collection, fields=("username", "topic"), interval=5.0, max_keys=1000):
+        self.collection = collection
+        self.fields = tuple(fields)
+        self.interval = interval
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._pid = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self.flushes = 0
+        self.failures = 0
+        self.flushed = 0
+        self._flush_total = 0.0
+        self._flush_max = 0.0
+        self._flush_last = 0.0
+        atexit.register(self.close)
+
+    def _ensure_thread(self):
+        # called with self._lock held; a forked child starts its own flusher
+        # and drops the parent's pending counts, which the parent still owns
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pending.clear()
+            self._pid = pid
+            self._wake = threading.Event()
+            threading.Thread(target=self._run, name="activity-flush", daemon=True).start()
+
+    def add(self, *values, n=1):
+        """Buffer an increment of n for the key given by `values`."""
+        with self._lock:
+            self._ensure_thread()
+            self._pending[values] = self._pending.get(values, 0) + n
+            full = len(self._pending) >= self.max_keys
+        if full:
+            self._wake.set()
+
+    def pending(self, *prefix):
+        """{key: increment} not yet written, for keys starting with `prefix`."""
+        size = len(prefix)
+        with self._lock:
+            if self._pid != os.getpid():
+                return {}
+            return {key: n for key, n in self._pending.items() if key[:size] == prefix}
+
+    def _run(self):
+        wake = self._wake
+        while not self._stopped:
+            wake.wait(self.interval)
+            wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("activity flush failed")
+
+    def flush(self):
+        """Write every pending increment now. Returns the number of keys written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            ops = [
+                UpdateOne(dict(zip(self.fields, key)), {"$inc": {"count": n}}, upsert=True)
+                for key, n in pending.items()
+            ]
+            start = time.perf_counter()
+            try:
+                self.collection.bulk_write(ops, ordered=False)
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                    for key, n in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + n
+                raise
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.flushes += 1
+                self.flushed += sum(pending.values())
+                self._flush_total += elapsed
+                self._flush_max = max(self._flush_max, elapsed)
+                self._flush_last = elapsed
+            return len(ops)
+
+    def close(self):
+        """Stop the flusher and write whatever is left (registered with atexit)."""
+        self._stopped = True
+        self._wake.set()
+        if self._pid == os.getpid():
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("final activity flush failed")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "buffered_keys": len(self._pending),
+                "buffered_increments": sum(self._pending.values()),
+                "flushes": self.flushes,
+                "flush_failures": self.failures,
+                "flushed_increments": self.flushed,
+                "avg_flush_ms": self._flush_total / self.flushes * 1000 if self.flushes else 0.0,
+                "max_flush_ms": self._flush_max * 1000,
+                "last_flush_ms": self._flush_last * 1000,
+                "interval_s": self.interval,
+                "max_keys": self.max_keys,
+            }
+
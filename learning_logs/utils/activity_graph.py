@@ -1,15 +1,37 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+HOUR_FORMAT = "%Y-%m-%dT%H"
+DAY_FORMAT = "%Y-%m-%d"
+
+
 class ActivityGraph:
-    def __init__(self, activities_collection, username):
+    def __init__(self, activities_collection, username, buffer=None, leaderboard=None, buckets=None):
         self.collection = activities_collection
         self.username = username
-    
+        # an ActivityBuffer turns add_activity into an in-memory increment
+        self.buffer = buffer
+        # optional LeaderboardCache and ActivityBuckets, kept up to date by add_activity
+        self.leaderboard = leaderboard
+        self.buckets = buckets
+
     def add_activity(self, topic):
+        if self.leaderboard is not None:
+            self.leaderboard.incr(self.username, topic)
+        if self.buckets is not None:
+            self.buckets.record(self.username)
+        if self.buffer is not None:
+            self.buffer.add(self.username, topic)
+            return
         self.collection.update_one(
             {"username": self.username, "topic": topic},
             {"$inc": {"count": 1}},
             upsert=True
         )
-    
+
     def sorted_topics(self):
         return list(self.collection.find({"username": self.username}).sort("count", -1))
 
@@ -18,3 +40,220 @@ class ActivityGraph:
 
     def least_active(self):
         return self.collection.find_one({"username": self.username}, sort=[("count", 1)])
+
+    def top(self, k=10):
+        """The k most visited topics as [{"topic", "count"}], busiest first."""
+        if self.leaderboard is not None and k <= self.leaderboard.depth:
+            return self.leaderboard.top(self.username, k, self._load_ends)
+        return self._ranked(k, -1)
+
+    def bottom(self, k=10):
+        """The k least visited topics as [{"topic", "count"}], quietest first."""
+        if self.leaderboard is not None and k <= self.leaderboard.depth:
+            return self.leaderboard.bottom(self.username, k, self._load_ends)
+        return self._ranked(k, 1)
+
+    def _ranked(self, k, direction):
+        # served by the (username, count) index, so only k documents are read
+        cursor = (self.collection.find({"username": self.username}, {"_id": 0, "topic": 1, "count": 1})
+                  .sort("count", direction)
+                  .limit(k))
+        return list(cursor)
+
+    def _load_ends(self, depth):
+        """
+        Seed a leaderboard: the `depth` busiest and quietest topics (two
+        limited index-ordered reads), plus exact counts for topics with
+        increments still in the buffer. Returns a Board.
+        """
+        top = self._ranked(depth, -1)
+        bottom = self._ranked(depth, 1)
+        counts = {row["topic"]: row.get("count", 0) for row in top + bottom}
+        # read after the collection: a flush in between undercounts for a moment, never doubles
+        pending = {}
+        if self.buffer is not None:
+            pending = {topic: n for (_, topic), n in self.buffer.pending(self.username).items()}
+        missing = [topic for topic in pending if topic not in counts]
+        if missing:
+            for doc in self.collection.find({"username": self.username, "topic": {"$in": missing}},
+                                            {"_id": 0, "topic": 1, "count": 1}):
+                counts[doc["topic"]] = doc.get("count", 0)
+        for topic, n in pending.items():
+            counts[topic] = counts.get(topic, 0) + n
+        return Board(
+            counts,
+            top_floor=top[-1].get("count", 0) if top else 0,
+            bottom_ceiling=bottom[-1].get("count", 0) if bottom else 0,
+            complete=len(top) < depth,
+        )
+
+
+class Board:
+    """
+    One user's leaderboard: exact counts for the topics at both ends (and any
+    topic with buffered increments when it was loaded), bumped in place by
+    add_activity.
+
+    Topics outside `counts` had at most `top_floor` visits and, unless they
+    are brand new, at least `bottom_ceiling` visits. When `complete`, the
+    user had fewer topics than the seed depth, so every topic is known and
+    an unseen one is new. Otherwise, increments to unseen topics go to
+    `unknown`. top() and bottom() use those bounds to decide whether the
+    known counts still answer the query, or whether the board must be
+    seeded again.
+    """
+
+    __slots__ = ("counts", "top_floor", "bottom_ceiling", "complete", "unknown", "loaded_at")
+
+    def __init__(self, counts, top_floor=0, bottom_ceiling=0, complete=False):
+        self.counts = counts
+        self.top_floor = top_floor
+        self.bottom_ceiling = bottom_ceiling
+        self.complete = complete
+        self.unknown = {}
+        self.loaded_at = time.monotonic()
+
+    def incr(self, topic, n):
+        if topic in self.counts:
+            self.counts[topic] += n
+        elif self.complete:
+            self.counts[topic] = n   # every existing topic is known, so this one is new
+        else:
+            self.unknown[topic] = self.unknown.get(topic, 0) + n
+
+    def top(self, k):
+        """The k busiest topics, or None when an unseen topic might belong among them."""
+        best = heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+        if self.unknown:
+            cutoff = best[-1][1] if len(best) == k else 0
+            if self.top_floor + max(self.unknown.values()) > cutoff:
+                return None
+        return best
+
+    def bottom(self, k):
+        """The k quietest topics, or None when an unseen topic might belong among them."""
+        worst = heapq.nsmallest(k, self.counts.items(), key=lambda item: item[1])
+        if not self.complete and worst and worst[-1][1] > self.bottom_ceiling:
+            return None   # the seeded quiet topics grew past ones never read
+        if self.unknown:
+            cutoff = worst[-1][1] if len(worst) == k else float("inf")
+            if min(self.unknown.values()) < cutoff:
+                return None
+        return worst
+
+
+class LeaderboardCache:
+    """
+    In-process per-user top-k / bottom-k without a query per request.
+
+    A user's board is seeded with the `depth` busiest and quietest topics,
+    using limited reads over the (username, count) index. It is never seeded
+    with every topic the user has. add_activity bumps it in place, so it
+    includes increments still waiting in the write-behind buffer. It is
+    seeded again only when an increment to a topic outside the board could
+    change the answer, or after `ttl` seconds, because other worker
+    processes write too. When the seed itself cannot tell (more topics tied
+    at its edge than it read), it is read again at twice the depth. Queries are heapq.nlargest over the board, O(depth
+    log k). At most `maxsize` users are kept, least recently used first out.
+    """
+
+    def __init__(self, maxsize=1000, ttl=60.0, depth=100):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.depth = depth
+        self._users = OrderedDict()   # username -> Board
+        self._lock = threading.Lock()
+
+    def _board(self, username, loader, depth=None):
+        now = time.monotonic()
+        with self._lock:
+            board = self._users.get(username)
+            if board is not None and depth is None and now - board.loaded_at < self.ttl:
+                self._users.move_to_end(username)
+                return board
+        board = loader(depth or self.depth)
+        with self._lock:
+            self._users[username] = board
+            self._users.move_to_end(username)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+        return board
+
+    def incr(self, username, topic, n=1):
+        with self._lock:
+            board = self._users.get(username)
+            if board is not None:
+                board.incr(topic, n)
+
+    def top(self, username, k, loader):
+        return self._ranked(username, k, loader, Board.top)
+
+    def bottom(self, username, k, loader):
+        return self._ranked(username, k, loader, Board.bottom)
+
+    def _ranked(self, username, k, loader, pick):
+        board = self._board(username, loader)
+        depth = self.depth
+        while True:
+            with self._lock:
+                rows = pick(board, k)
+            if rows is not None:
+                return [{"topic": topic, "count": count} for topic, count in rows]
+            # seed again; when even a fresh board is ambiguous (many topics tied
+            # at its edge), read deeper. A complete board always answers.
+            board = self._board(username, loader, depth)
+            depth *= 2
+
+
+class ActivityBuckets:
+    """
+    Hourly and daily activity counters per user, one document per bucket:
+    {username, period: "hour" | "day", bucket: "2024-05-01T13" | "2024-05-01", count}.
+    A heatmap reads at most 24 documents per day shown, never raw events.
+    """
+
+    def __init__(self, collection, buffer=None):
+        self.collection = collection
+        # an ActivityBuffer with fields (username, period, bucket)
+        self.buffer = buffer
+
+    def record(self, username, when=None, n=1):
+        when = when or datetime.now()
+        for period, fmt in (("hour", HOUR_FORMAT), ("day", DAY_FORMAT)):
+            bucket = when.strftime(fmt)
+            if self.buffer is not None:
+                self.buffer.add(username, period, bucket, n=n)
+            else:
+                self.collection.update_one(
+                    {"username": username, "period": period, "bucket": bucket},
+                    {"$inc": {"count": n}},
+                    upsert=True
+                )
+
+    def counts(self, username, period, since):
+        """{bucket: count} for one period from `since` (a bucket string) on."""
+        cursor = self.collection.find(
+            {"username": username, "period": period, "bucket": {"$gte": since}},
+            {"_id": 0, "bucket": 1, "count": 1},
+        )
+        return {doc["bucket"]: doc["count"] for doc in cursor}
+
+    def heatmap(self, username, days=28, today=None):
+        """
+        Activity over the last `days` days: a 7 x 24 weekday-by-hour grid
+        (Monday first) and one total per calendar day, oldest first.
+        """
+        today = today or datetime.now()
+        first = (today - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        grid = [[0] * 24 for _ in range(7)]
+        for bucket, count in self.counts(username, "hour", first.strftime(HOUR_FORMAT)).items():
+            when = datetime.strptime(bucket, HOUR_FORMAT)
+            grid[when.weekday()][when.hour] += count
+
+        daily = self.counts(username, "day", first.strftime(DAY_FORMAT))
+        calendar = []
+        for offset in range(days):
+            day = (first + timedelta(days=offset)).strftime(DAY_FORMAT)
+            calendar.append({"day": day, "count": daily.get(day, 0)})
+        return {"grid": grid, "days": calendar}
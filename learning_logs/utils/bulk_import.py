@@ -0,0 +1,230 @@
+"""
+Bulk entry import: many entries, for one or more topics, in one request.
+
+The body is NDJSON (one JSON object per line) or a JSON array of objects:
+
+    {"topic_id": "...", "text": "...", "date_added": "YYYY-MM-DD HH:MM:SS"}
+
+date_added is optional and defaults to now. Every item is validated on its
+own and bad items are reported by their position rather than failing the
+batch. All topic ids are checked with one $in query, the valid texts are
+scored as one batch, and entries are written with chunked
+insert_many(ordered=False). Topic counters and daily rollups are then updated
+with one bulk_write each. Near-duplicates (of stored entries or of earlier
+items) are found with one signature query for the whole batch and flagged or
+rejected per DEDUPE_MODE, like add_entry.
+"""
+import json
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..dedupe import dedupe_mode, get_deduper
+from ..mongo_client import entries_collection, rollups_collection, topics_collection, users_collection
+from ..search import index_entries
+from ..sentiment import get_analyzer, score_batch
+from .conditional import bump_user_stamp
+from .rollups import rollup_updates
+from .topic_stats import stats_update
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+def read_body(stream, content_length, max_bytes):
+    """
+    Read a request body of at most max_bytes from `stream` (the request
+    itself). This is used instead of request.body, whose
+    DATA_UPLOAD_MAX_MEMORY_SIZE cap (2.5 MB by default) is far below what
+    BULK_IMPORT_MAX_ITEMS entries take.
+    """
+    try:
+        declared = int(content_length or 0)
+    except ValueError:
+        declared = 0
+    if declared > max_bytes:
+        raise PayloadTooLarge(f"At most {max_bytes} bytes per request.")
+    body = stream.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        raise PayloadTooLarge(f"At most {max_bytes} bytes per request.")
+    return body
+
+
+def parse_payload(body, content_type=""):
+    """
+    Split a request body into (items, errors). items is a list of
+    (index, object) pairs; errors holds {"index", "error"} for lines that are
+    not valid JSON. Raises ValueError if the body cannot be read at all.
+    """
+    try:
+        text = body.decode("utf-8") if isinstance(body, bytes) else body
+    except UnicodeDecodeError:
+        raise ValueError("Body must be UTF-8.")
+
+    stripped = text.lstrip()
+    if "ndjson" not in content_type and stripped.startswith("["):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON array: {e}")
+        return list(enumerate(data)), []
+
+    items, errors = [], []
+    index = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append((index, json.loads(line)))
+        except json.JSONDecodeError as e:
+            errors.append({"index": index, "error": f"Invalid JSON: {e.msg}"})
+        index += 1
+    return items, errors
+
+
+def _validate(item):
+    """(topic ObjectId, text, date_added) for one item; raises ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("Each item must be a JSON object.")
+    text = item.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("'text' is required.")
+    topic_id = item.get("topic_id")
+    if not isinstance(topic_id, str) or not topic_id:
+        # ObjectId(None) would mint a fresh id and surface as "Topic not found."
+        raise ValueError("'topic_id' is required.")
+    try:
+        topic_id = ObjectId(topic_id)
+    except (InvalidId, TypeError):
+        raise ValueError("Invalid topic_id format.")
+    date_added = item.get("date_added")
+    if date_added is None:
+        date_added = datetime.now().strftime(DATE_FORMAT)
+    else:
+        try:
+            parsed = datetime.strptime(date_added, DATE_FORMAT)
+        except (TypeError, ValueError):
+            raise ValueError(f"'date_added' must look like {DATE_FORMAT}.")
+        # strptime also takes unpadded fields; store the canonical form so rollup
+        # day keys and the lexicographic last_entry_at $max stay correct
+        date_added = parsed.strftime(DATE_FORMAT)
+    return topic_id, text, date_added
+
+
+def import_entries(items, username, chunk_size=1000):
+    """
+    Validate, score and insert (index, item) pairs for username's topics.
+    Returns (inserted count, per-item errors).
+    """
+    errors = []
+    valid = []
+    for index, item in items:
+        try:
+            valid.append((index, *_validate(item)))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+
+    # one round trip to check every referenced topic exists and belongs to the user
+    wanted = list({topic_id for _, topic_id, _, _ in valid})
+    owned = {doc["_id"] for doc in topics_collection.find(
+        {"_id": {"$in": wanted}, "username": username}, {"_id": 1})} if wanted else set()
+    rows = []
+    for row in valid:
+        if row[1] in owned:
+            rows.append(row)
+        else:
+            errors.append({"index": row[0], "error": "Topic not found."})
+
+    # ids are assigned up front so batch items can point at each other as duplicates
+    ids = [ObjectId() for _ in rows]
+    sigs, duplicates = {}, {}
+    deduper = get_deduper()
+    if deduper is not None:
+        sigs = {entry_id: deduper.signature(text) for entry_id, (_, _, text, _) in zip(ids, rows)}
+        matches = deduper.find_duplicates(username, list(sigs.items()))
+        if dedupe_mode() == "reject":
+            kept = []
+            for entry_id, row, match in zip(ids, rows, matches):
+                if match:
+                    errors.append({"index": row[0], "error": "Near-duplicate of an existing entry.",
+                                   "duplicate_of": str(match[0]), "similarity": match[1]})
+                else:
+                    kept.append((entry_id, row))
+            ids, rows = [entry_id for entry_id, _ in kept], [row for _, row in kept]
+        else:
+            duplicates = {entry_id: match[0] for entry_id, match in zip(ids, matches) if match}
+
+    version = get_analyzer().lexicon_version
+    scores = score_batch([text for _, _, text, _ in rows])
+    inserted = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        docs = [
+            {
+                "_id": entry_id,
+                "topic_id": topic_id,
+                "text": text,
+                "username": username,
+                "sentiment": senti.get("label", "neutral"),
+                "score": senti.get("compound", 0),
+                "lexicon_version": version,
+                "date_added": date_added,
+            }
+            for entry_id, (_, topic_id, text, date_added), senti
+            in zip(ids[start:start + chunk_size], chunk, scores[start:start + chunk_size])
+        ]
+        for doc in docs:
+            if doc["_id"] in duplicates:
+                doc["duplicate_of"] = duplicates[doc["_id"]]
+        failed = set()
+        try:
+            entries_collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                errors.append({"index": chunk[write_error["index"]][0],
+                               "error": write_error.get("errmsg", "Write failed.")})
+        inserted.extend(doc for k, doc in enumerate(docs) if k not in failed)
+
+    if inserted:
+        by_topic = defaultdict(list)
+        for doc in inserted:
+            by_topic[doc["topic_id"]].append(doc)
+        topics_collection.bulk_write(
+            [UpdateOne({"_id": topic_id}, stats_update(docs)) for topic_id, docs in by_topic.items()],
+            ordered=False,
+        )
+        rollups_collection.bulk_write(rollup_updates(inserted), ordered=False)
+        bump_user_stamp(users_collection, username)
+        index_entries(inserted)
+        if deduper is not None:
+            deduper.add([(doc, sigs[doc["_id"]]) for doc in inserted])
+
+    errors.sort(key=lambda error: error["index"])
+    return len(inserted), errors
+
+
+def run_import(body, content_type, username, max_items, chunk_size):
+    """Parse and import a request body, returning the JSON report."""
+    start = time.perf_counter()
+    items, errors = parse_payload(body, content_type)
+    if len(items) + len(errors) > max_items:
+        raise PayloadTooLarge(f"At most {max_items} entries per request.")
+    inserted, item_errors = import_entries(items, username, chunk_size)
+    errors = sorted(errors + item_errors, key=lambda error: error["index"])
+    elapsed = time.perf_counter() - start
+    return {
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "entries_per_s": round(inserted / elapsed) if elapsed else None,
+    }
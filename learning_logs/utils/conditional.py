@@ -0,0 +1,169 @@
+"""
+Conditional GET for the topic and entry listings.
+
+Each listing has a cheap version stamp. A user's topic list is stamped with
+users.topics_version / topics_modified, bumped by add_topic and add_entry.
+A topic's entries are stamped with topics.listing_version / modified_at,
+bumped with the entry counters. topics.version is kept apart: it keys the
+cached summary, which only changes when entries are added or excluded, so
+re-scoring does not force every summary to be rebuilt. Anything else that
+rewrites what a listing shows (rescore_entries, reconcile_topic_stats) must
+bump the stamps too, with bump_user_stamps and bump_topic_stamps. The ETag is
+a digest of the stamp and the full request path, so it can be checked, and a
+304 sent, with one indexed read and without touching the listing itself.
+
+ListingCache optionally keeps recent response bodies by ETag
+(LISTING_CACHE_SIZE, 0 disables it). A new version means a new ETag, so
+stale bodies are never served and simply age out.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def bump_user_stamp(users_collection, username):
+    """Mark username's topic list as changed (no-op for users without a document)."""
+    users_collection.update_one(
+        {"username": username},
+        {"$inc": {"topics_version": 1}, "$currentDate": {"topics_modified": True}},
+    )
+
+
+def bump_user_stamps(users_collection, usernames):
+    """bump_user_stamp for many users at once."""
+    usernames = list(usernames)
+    if usernames:
+        users_collection.update_many(
+            {"username": {"$in": usernames}},
+            {"$inc": {"topics_version": 1}, "$currentDate": {"topics_modified": True}},
+        )
+
+
+def bump_topic_stamps(topics_collection, topic_ids):
+    """Mark the entry lists of the given topics as changed."""
+    topic_ids = list(topic_ids)
+    if topic_ids:
+        topics_collection.update_many(
+            {"_id": {"$in": topic_ids}},
+            {"$inc": {"listing_version": 1}, "$currentDate": {"modified_at": True}},
+        )
+
+
+def user_stamp(users_collection, username):
+    """(version, modified datetime) of username's topic list, or None."""
+    user = users_collection.find_one({"username": username}, {"topics_version": 1, "topics_modified": 1})
+    if not user:
+        return None
+    return user.get("topics_version", 0), user.get("topics_modified")
+
+
+def topic_stamp(topics_collection, topic_obj_id):
+    """(version, modified datetime) of a topic's entry list, or None."""
+    topic = topics_collection.find_one({"_id": topic_obj_id}, {"listing_version": 1, "modified_at": 1})
+    if not topic:
+        return None
+    return topic.get("listing_version", 0), topic.get("modified_at")
+
+
+class ListingCache:
+    """Bounded LRU of serialized listing bodies keyed by ETag."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return body
+
+    def put(self, etag, body):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_listing_cache():
+    """The process-wide ListingCache, or None when LISTING_CACHE_SIZE is 0."""
+    size = getattr(settings, "LISTING_CACHE_SIZE", 0)
+    return ListingCache(size) if size else None
+
+
+def _validators(request, scope, stamp):
+    version, modified = stamp
+    digest = hashlib.blake2b(f"{scope}\0{version}\0{request.get_full_path()}".encode(), digest_size=12)
+    last_modified = None
+    if modified is not None:
+        # pymongo hands back naive UTC datetimes
+        last_modified = int(modified.replace(tzinfo=modified.tzinfo or timezone.utc).timestamp())
+    return f'"{digest.hexdigest()}"', last_modified
+
+
+def precondition(request, scope, stamp, cache=None):
+    """
+    Check the request's validators against a listing stamp. Returns
+    (validators, response): response is a 304, or a cached 200, that can be
+    returned as is; otherwise None and the caller builds the listing, then
+    passes it through finish(). A missing stamp disables both.
+    """
+    if stamp is None:
+        return None, None
+    etag, last_modified = _validators(request, scope, stamp)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None and cache is not None:
+        body = cache.get(etag)
+        if body is not None:
+            response = HttpResponse(body, content_type="application/json")
+    if response is not None:
+        _set_headers(response, etag, last_modified)
+    return (etag, last_modified), response
+
+
+def finish(response, validators, cache=None):
+    """Add ETag / Last-Modified to a freshly built listing and remember its body."""
+    if validators is None or response.status_code != 200:
+        return response
+    etag, last_modified = validators
+    _set_headers(response, etag, last_modified)
+    if cache is not None and not response.streaming:
+        cache.put(etag, response.content)
+    return response
+
+
+def _set_headers(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # let the browser keep the body but always revalidate it
+    response["Cache-Control"] = "private, no-cache"
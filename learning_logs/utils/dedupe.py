@@ -0,0 +1,180 @@
+"""
+Near-duplicate entries with MinHash and LSH banding.
+
+An entry's text becomes a set of word shingles (3 consecutive word tokens
+from MiniVader's tokenizer, lowercased). MinHash compresses that set into
+NUM_PERM values whose agreement rate estimates Jaccard similarity. The
+signature is cut into BANDS bands of ROWS values. Each band is hashed to a
+short key, and two entries become candidates when any band key matches. With
+16 x 8, pairs at Jaccard 0.8 collide with probability ~0.97, and pairs at
+0.4 with ~0.01. Candidates are then checked against the full signatures.
+
+Texts with fewer than MIN_SHINGLES shingles (under 7 words) get no
+signature. Short notes like "good day" repeat all the time, and they are
+not duplicates in any useful sense.
+
+Only one representative per cluster is stored: the first entry seen. Flagged
+duplicates are matched against it but never stored themselves, so repeating
+the same text does not grow anyone's candidate list. Signatures are stored
+one document per representative, with the band keys in a multikey-indexed
+array, so finding candidates for a new entry is one indexed $in query,
+capped at MAX_CANDIDATES, instead of a comparison with every entry:
+
+    {_id: entry_id, username, topic_id, sig: [...], bk: ["0:ab12..", ...]}
+"""
+import hashlib
+import random
+import struct
+
+from pymongo import InsertOne
+
+from .search_index import tokens
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+MIN_SHINGLES = 5
+MAX_CANDIDATES = 50
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(0x5EED)  # fixed, signatures must be stable across processes and restarts
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _hash(value):
+    return struct.unpack("<Q", hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest())[0]
+
+
+def shingles(analyzer, text):
+    words = tokens(analyzer, text)
+    if len(words) <= SHINGLE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+
+
+def signature(analyzer, text, min_shingles=MIN_SHINGLES):
+    """MinHash signature of a text, or None when it is too short to compare."""
+    hashed = [_hash(s) for s in shingles(analyzer, text)]
+    if not hashed or len(hashed) < min_shingles:
+        return None
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashed) for a, b in _PERMS]
+
+
+def band_keys(sig):
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f"<{ROWS}I", *sig[band * ROWS:(band + 1) * ROWS])
+        keys.append(f"{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class BandIndex:
+    """
+    In-memory LSH buckets of representative signatures. Each lookup checks at
+    most `max_candidates` of them, and an exact signature match ends it.
+    """
+
+    def __init__(self, threshold, max_candidates=MAX_CANDIDATES):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self._buckets = {}   # band key -> [(doc_id, sig)]
+
+    def add(self, doc_id, sig, keys=None):
+        for key in keys or band_keys(sig):
+            self._buckets.setdefault(key, []).append((doc_id, sig))
+
+    def match(self, sig, keys=None):
+        """(doc_id, similarity) of the closest representative above the threshold, or None."""
+        best = None
+        seen = set()
+        for key in keys or band_keys(sig):
+            for doc_id, other in self._buckets.get(key, ()):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                score = similarity(sig, other)
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (doc_id, score)
+                    if score == 1.0:
+                        return best
+                if len(seen) >= self.max_candidates:
+                    return best
+        return best
+
+
+class Deduper:
+    def __init__(self, collection, analyzer, threshold=0.8, min_shingles=MIN_SHINGLES,
+                 max_candidates=MAX_CANDIDATES):
+        self.collection = collection
+        self.analyzer = analyzer
+        self.threshold = threshold
+        self.min_shingles = min_shingles
+        self.max_candidates = max_candidates
+
+    def signature(self, text):
+        return signature(self.analyzer, text, self.min_shingles)
+
+    def band_index(self):
+        return BandIndex(self.threshold, self.max_candidates)
+
+    def find_duplicate(self, username, sig):
+        """(entry_id, similarity) of the closest stored entry above the threshold, or None."""
+        if sig is None:
+            return None
+        keys = band_keys(sig)
+        index = self.band_index()
+        cursor = self.collection.find({"username": username, "bk": {"$in": keys}}, {"sig": 1}) \
+            .limit(self.max_candidates)
+        for doc in cursor:
+            index.add(doc["_id"], doc["sig"], keys)   # every candidate shares at least one of these keys
+        return index.match(sig, keys)
+
+    def find_duplicates(self, username, sigs):
+        """
+        find_duplicate for a batch: [(entry_id, similarity) or None] per
+        (entry_id, sig) pair, matching stored entries and earlier batch items.
+        Only items without a match become representatives for later ones.
+        """
+        index = self.band_index()
+        keys = sorted({key for _, sig in sigs if sig is not None for key in band_keys(sig)})
+        if keys:
+            for doc in self.collection.find({"username": username, "bk": {"$in": keys}}, {"sig": 1, "bk": 1}):
+                index.add(doc["_id"], doc["sig"], doc["bk"])
+
+        results = []
+        for entry_id, sig in sigs:
+            if sig is None:
+                results.append(None)
+                continue
+            keys = band_keys(sig)
+            match = index.match(sig, keys)
+            if match is None:
+                index.add(entry_id, sig, keys)
+            results.append(match)
+        return results
+
+    def insert_op(self, entry, sig):
+        return InsertOne({
+            "_id": entry["_id"],
+            "username": entry["username"],
+            "topic_id": entry.get("topic_id"),
+            "sig": sig,
+            "bk": band_keys(sig),
+        })
+
+    def add(self, entries_and_sigs):
+        """
+        Store signatures for saved entries, given (entry, sig) pairs. Entries
+        flagged as duplicates are skipped; their representative is stored.
+        """
+        ops = [self.insert_op(entry, sig) for entry, sig in entries_and_sigs
+               if sig is not None and "duplicate_of" not in entry]
+        if ops:
+            self.collection.bulk_write(ops, ordered=False)
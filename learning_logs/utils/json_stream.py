@@ -0,0 +1,73 @@
+"""
+Streamed JSON arrays for large listings.
+
+stream_array() walks a pymongo cursor a batch at a time and yields encoded
+chunks of one JSON array, so a response never holds the whole listing, either
+as documents or as text, and the first bytes go out after the first batch.
+orjson is used when it is installed (it handles datetime natively and is much
+faster), otherwise the stdlib encoder. ObjectId is written as its hex string
+and datetimes as ISO 8601 either way.
+"""
+import itertools
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+BATCH_SIZE = 1000
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def encode_batch(docs):
+        """Comma-separated JSON for a list of documents (no brackets)."""
+        # one orjson call per batch, then drop the array brackets
+        return orjson.dumps(docs, default=_default)[1:-1]
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def encode_batch(docs):
+        """Comma-separated JSON for a list of documents (no brackets)."""
+        return ",".join(map(_encoder.encode, docs)).encode("utf-8")
+
+
+def stream_array(cursor, transform=None, batch_size=BATCH_SIZE):
+    """Yield the documents of a cursor as the chunks of one JSON array."""
+    yield b"["
+    first = True
+    while True:
+        docs = list(itertools.islice(cursor, batch_size))
+        if not docs:
+            break
+        if transform is not None:
+            docs = [transform(doc) for doc in docs]
+        yield encode_batch(docs) if first else b"," + encode_batch(docs)
+        first = False
+    yield b"]"
+
+
+async def astream_array(cursor, run_io, transform=None, batch_size=BATCH_SIZE):
+    """stream_array() for async views: each batch is read on the I/O pool."""
+    yield b"["
+    first = True
+    while True:
+        docs = await run_io(lambda: list(itertools.islice(cursor, batch_size)))
+        if not docs:
+            break
+        if transform is not None:
+            docs = [transform(doc) for doc in docs]
+        yield encode_batch(docs) if first else b"," + encode_batch(docs)
+        first = False
+    yield b"]"
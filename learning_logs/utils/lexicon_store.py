@@ -0,0 +1,178 @@
+"""
+External MiniVader lexicons.
+
+A lexicon source is a text file with one term per line, ``term<TAB>valence``,
+where any further columns are ignored (so VADER's vader_lexicon.txt loads as
+is). Lines starting with ``#`` are comments. Multi-word phrases are allowed
+as long as the term and valence are tab separated.
+
+compile_lexicon() turns a lexicon into a read-only binary artifact that
+MappedLexicon opens with mmap. Forked workers share the mapped pages and
+startup only has to read the fixed-size header.
+
+Layout (little endian):
+
+    header   magic, format, count, slots, keys_len, digest[16]
+    values   count x float64
+    offsets  (count + 1) x uint32 into the key blob
+    slots    slots x uint32 open-addressing table of key index + 1 (0 = empty)
+    keys     utf-8 keys, sorted by their encoded bytes
+"""
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+
+MAGIC = b"MVLX"
+FORMAT = 1
+_HEADER = struct.Struct("<4sIIII16s")
+_VALUE = struct.Struct("<d")
+_INDEX = struct.Struct("<I")
+
+
+def load_lexicon_text(path):
+    """Parse a term<TAB>valence lexicon source into a dict."""
+    lexicon = {}
+    with open(path, encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            if "\t" in line:
+                term, value = line.split("\t")[:2]
+            else:
+                term, _, value = line.strip().rpartition(" ")
+            try:
+                lexicon[term.strip().lower()] = float(value)
+            except ValueError:
+                raise ValueError(f"{path}:{line_no}: bad valence {value!r}") from None
+    return lexicon
+
+
+def lexicon_digest(items):
+    """Version hash for a lexicon given its (term, valence) pairs."""
+    digest = hashlib.blake2b(digest_size=16)
+    for term, value in sorted(items):
+        digest.update(term.encode("utf-8"))
+        digest.update(b"\t")
+        digest.update(_VALUE.pack(value))
+        digest.update(b"\n")
+    return digest.digest()
+
+
+def _slot_count(count):
+    slots = 8
+    while slots < count * 2:
+        slots *= 2
+    return slots
+
+
+def compile_lexicon(lexicon, out_path):
+    """Write a lexicon mapping to the binary format, returning its version hash."""
+    pairs = sorted((term.encode("utf-8"), float(value)) for term, value in lexicon.items())
+    count = len(pairs)
+    slots = _slot_count(count)
+    digest = lexicon_digest((term.decode("utf-8"), value) for term, value in pairs)
+
+    offsets = [0]
+    for term, _ in pairs:
+        offsets.append(offsets[-1] + len(term))
+
+    table = [0] * slots
+    for index, (term, _) in enumerate(pairs):
+        slot = zlib.crc32(term) & (slots - 1)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = index + 1
+
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(MAGIC, FORMAT, count, slots, offsets[-1], digest))
+        fh.write(struct.pack(f"<{count}d", *(value for _, value in pairs)))
+        fh.write(struct.pack(f"<{count + 1}I", *offsets))
+        fh.write(struct.pack(f"<{slots}I", *table))
+        for term, _ in pairs:
+            fh.write(term)
+    os.replace(tmp_path, out_path)  # readers never see a half-written file
+    return digest.hex()
+
+
+class MappedLexicon(Mapping):
+    """Read-only lexicon mapping backed by an mmap of a compiled artifact."""
+
+    def __init__(self, path, memo_size=65536):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, count, slots, keys_len, digest = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError(f"{self.path} is not a compiled MiniVader lexicon")
+        self._count = count
+        self._slots = slots
+        self._values_at = _HEADER.size
+        self._offsets_at = self._values_at + 8 * count
+        self._slots_at = self._offsets_at + 4 * (count + 1)
+        self._keys_at = self._slots_at + 4 * slots
+        self.version = digest.hex()
+        # recently looked-up tokens, so hot words cost one dict probe
+        self._memo = {}
+        self._memo_size = memo_size
+
+    def __reduce__(self):
+        # workers reopen the file and share its pages instead of copying the data
+        return type(self), (self.path, self._memo_size)
+
+    def _key(self, index):
+        start, end = struct.unpack_from("<II", self._mm, self._offsets_at + 4 * index)
+        return self._mm[self._keys_at + start:self._keys_at + end]
+
+    def _find(self, term):
+        if not isinstance(term, str):
+            return None
+        encoded = term.encode("utf-8", "surrogatepass")
+        mask = self._slots - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            entry = _INDEX.unpack_from(self._mm, self._slots_at + 4 * slot)[0]
+            if not entry:
+                return None
+            if self._key(entry - 1) == encoded:
+                return _VALUE.unpack_from(self._mm, self._values_at + 8 * (entry - 1))[0]
+            slot = (slot + 1) & mask
+
+    def get(self, term, default=None):
+        try:
+            value = self._memo[term]
+        except (KeyError, TypeError):
+            value = self._find(term)
+            if isinstance(term, str) and len(self._memo) < self._memo_size:
+                self._memo[term] = value
+        return default if value is None else value
+
+    def __getitem__(self, term):
+        value = self.get(term)
+        if value is None:
+            raise KeyError(term)
+        return value
+
+    def __contains__(self, term):
+        return self.get(term) is not None
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._key(index).decode("utf-8")
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._mm.close()
+
+
+def open_lexicon(path):
+    """Open a compiled lexicon, or load a text source into a dict."""
+    with open(path, "rb") as fh:
+        is_compiled = fh.read(len(MAGIC)) == MAGIC
+    return MappedLexicon(path) if is_compiled else load_lexicon_text(path)
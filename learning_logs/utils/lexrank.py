@@ -0,0 +1,156 @@
+"""
+Native LexRank for large topics.
+
+Follows sumy's LexRankSummarizer: tf normalized by the sentence's max tf,
+idf = log(N / (1 + df)), idf-modified cosine, a binary similarity graph
+thresholded at 0.1, and power iteration until the step is below epsilon.
+The similarity graph is never held as a dense N x N matrix. TF-IDF vectors
+are sparse, similarities are computed a block of rows at a time through the
+term postings, and only edges above the threshold are kept. The power
+iteration then runs over that edge list.
+"""
+import re
+
+import numpy as np
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def split_sentences(texts):
+    sentences = []
+    for text in texts:
+        for sentence in _SENTENCE_SPLIT_RE.split(text or ""):
+            sentence = sentence.strip()
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+class LexRank:
+    def __init__(self, threshold=0.1, epsilon=0.1, stop_words=(),
+                 max_sentences=None, preselect="tfidf", block_cells=2_000_000):
+        """
+        max_sentences caps how many sentences enter the graph. preselect
+        picks them, either "recent" (the last N, since entries are stored
+        oldest first) or "tfidf" (the N with the highest total tf-idf weight).
+        block_cells bounds the dense similarity block, and the number of
+        posting pairs expanded for it, at any one time.
+        """
+        if preselect not in ("recent", "tfidf"):
+            raise ValueError("preselect must be 'recent' or 'tfidf'")
+        self.threshold = threshold
+        self.epsilon = epsilon
+        self.stop_words = frozenset(w.lower() for w in stop_words)
+        self.max_sentences = max_sentences
+        self.preselect = preselect
+        self.block_cells = block_cells
+
+    def _tfidf(self, sentences):
+        """Sparse tf-idf matrix as CSR arrays (indptr, term ids, weights)."""
+        vocab = {}
+        indptr = [0]
+        terms, tfs = [], []
+        for sentence in sentences:
+            counts = {}
+            for word in _WORD_RE.findall(sentence.lower()):
+                if word not in self.stop_words:
+                    counts[word] = counts.get(word, 0) + 1
+            max_tf = max(counts.values()) if counts else 1
+            for word, count in counts.items():
+                terms.append(vocab.setdefault(word, len(vocab)))
+                tfs.append(count / max_tf)
+            indptr.append(len(terms))
+
+        indptr = np.array(indptr, dtype=np.int64)
+        terms = np.array(terms, dtype=np.int64)
+        df = np.bincount(terms, minlength=len(vocab))
+        idf = np.log(len(sentences) / (1.0 + df))
+        return indptr, terms, np.array(tfs) * idf[terms], len(vocab)
+
+    def _edges(self, indptr, terms, weights, n_terms):
+        """Edges (rows, cols) of the thresholded idf-modified cosine graph."""
+        n = len(indptr) - 1
+        rows_of = np.repeat(np.arange(n), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows_of, weights=weights * weights, minlength=n))
+
+        # postings: for each term the sentences that contain it, with weights
+        order = np.argsort(terms, kind="stable")
+        post_sent = rows_of[order]
+        post_w = weights[order]
+        post_ptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=n_terms), out=post_ptr[1:])
+        df = np.diff(post_ptr)
+
+        # blocks are bounded both in dense cells and in expanded posting pairs
+        max_rows = max(1, self.block_cells // max(n, 1))
+        pair_ends = np.cumsum(np.bincount(rows_of, weights=df[terms], minlength=n))
+        edge_rows, edge_cols = [], []
+        start = 0
+        while start < n:
+            done = pair_ends[start - 1] if start else 0.0
+            stop = int(np.searchsorted(pair_ends, done + self.block_cells, side="right"))
+            stop = min(n, start + max_rows, max(stop, start + 1))
+            lo, hi = indptr[start], indptr[stop]
+            local = rows_of[lo:hi] - start
+            t = terms[lo:hi]
+            w = weights[lo:hi]
+
+            # expand every (sentence, term) of the block over the term's postings
+            lengths = df[t]
+            total = int(lengths.sum())
+            first = np.repeat(post_ptr[t], lengths)
+            within = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            idx = first + within
+            pair_rows = np.repeat(local, lengths)
+            pair_vals = np.repeat(w, lengths) * post_w[idx]
+
+            numer = np.bincount(pair_rows * n + post_sent[idx], weights=pair_vals,
+                                minlength=(stop - start) * n).reshape(stop - start, n)
+            denom = norms[start:stop, None] * norms[None, :]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                sim = np.where(denom > 0, numer / denom, 0.0)
+            r, c = np.nonzero(sim > self.threshold)
+            edge_rows.append(r + start)
+            edge_cols.append(c)
+            start = stop
+
+        return np.concatenate(edge_rows), np.concatenate(edge_cols)
+
+    def rank(self, sentences):
+        """LexRank centrality score for each sentence."""
+        n = len(sentences)
+        if not n:
+            return np.zeros(0)
+        rows, cols = self._edges(*self._tfidf(sentences))
+        degrees = np.maximum(np.bincount(rows, minlength=n), 1).astype(np.float64)
+
+        p = np.full(n, 1.0 / n)
+        step = 1.0
+        while step > self.epsilon:
+            nxt = np.bincount(cols, weights=p[rows] / degrees[rows], minlength=n)
+            norm = np.linalg.norm(nxt)
+            if norm == 0:
+                break
+            nxt /= norm
+            step = np.linalg.norm(nxt - p)
+            p = nxt
+        return p
+
+    def _preselect(self, sentences):
+        if not self.max_sentences or len(sentences) <= self.max_sentences:
+            return sentences
+        if self.preselect == "recent":
+            return sentences[-self.max_sentences:]
+        indptr, _, weights, _ = self._tfidf(sentences)
+        rows_of = np.repeat(np.arange(len(sentences)), np.diff(indptr))
+        mass = np.bincount(rows_of, weights=np.abs(weights), minlength=len(sentences))
+        keep = np.sort(np.argsort(-mass, kind="stable")[:self.max_sentences])
+        return [sentences[i] for i in keep]
+
+    def summarize(self, texts, sentences_count=3):
+        """Top sentences of the joined texts, in their original order."""
+        sentences = self._preselect(split_sentences(texts))
+        scores = self.rank(sentences)
+        best = np.sort(np.argsort(-scores, kind="stable")[:sentences_count])
+        return [sentences[i] for i in best]
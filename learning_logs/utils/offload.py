@@ -0,0 +1,51 @@
+"""
+Bounded executors for the async views.
+
+pymongo blocks, so the async views hand each database call to a fixed pool
+of I/O threads (ASYNC_IO_THREADS, kept at or below MONGO_MAX_POOL_SIZE so a
+thread never waits on a connection). CPU-bound work such as MiniVader scoring
+or LexRank goes to a separate, smaller pool (ASYNC_CPU_THREADS). A burst of
+summaries then cannot starve the database calls, and neither can block the
+event loop. Like the Mongo client, the pools are created lazily per process.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_executors = {}
+_executors_pid = None
+
+
+def _executor(kind):
+    global _executors_pid
+    pid = os.getpid()
+    executor = _executors.get(kind) if _executors_pid == pid else None
+    if executor is None:
+        with _lock:
+            if _executors_pid != pid:
+                _executors.clear()  # threads do not survive a fork
+                _executors_pid = pid
+            executor = _executors.get(kind)
+            if executor is None:
+                if kind == "io":
+                    workers = getattr(settings, "ASYNC_IO_THREADS", 32)
+                else:
+                    workers = getattr(settings, "ASYNC_CPU_THREADS", None) or os.cpu_count() or 1
+                executor = _executors[kind] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix=f"async-{kind}")
+    return executor
+
+
+async def run_io(fn, *args, **kwargs):
+    """Await fn(*args, **kwargs) on the bounded I/O pool (pymongo calls)."""
+    return await asyncio.get_running_loop().run_in_executor(_executor("io"), partial(fn, *args, **kwargs))
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Await fn(*args, **kwargs) on the CPU pool (scoring, summarizing)."""
+    return await asyncio.get_running_loop().run_in_executor(_executor("cpu"), partial(fn, *args, **kwargs))
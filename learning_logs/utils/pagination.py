@@ -0,0 +1,57 @@
+import base64
+import binascii
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(object_id):
+    """Opaque page cursor for the last _id of a page."""
+    return base64.urlsafe_b64encode(object_id.binary).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, InvalidId, TypeError, ValueError):
+        raise ValueError("Invalid 'after' cursor.")
+
+
+def page_params(request):
+    """(limit, after_id) from the query string; raises ValueError on bad input."""
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("'limit' must be an integer.")
+    if limit < 1:
+        raise ValueError("'limit' must be at least 1.")
+    after = request.GET.get("after")
+    return min(limit, MAX_LIMIT), decode_cursor(after) if after else None
+
+
+def fetch_page(collection, query, projection, limit, after=None):
+    """
+    One keyset page of documents in _id order. Reads limit + 1 documents so
+    the next cursor is only handed out when another page really exists.
+    Returns (documents, next_cursor).
+    """
+    if after is not None:
+        query = {**query, "_id": {"$gt": after}}
+    projection = {**projection, "_id": 1}
+    docs = list(collection.find(query, projection).sort("_id", 1).limit(limit + 1))
+    more = len(docs) > limit
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1]["_id"]) if more else None
+
+
+def wants_everything(request):
+    """The old unpaginated array, kept behind an explicit ?all=1."""
+    return request.GET.get("all") in ("1", "true", "yes")
+
+
+def wants_stream(request):
+    """The whole listing as a streamed JSON array (?stream=1)."""
+    return request.GET.get("stream") in ("1", "true", "yes")
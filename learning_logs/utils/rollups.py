@@ -0,0 +1,99 @@
+"""
+Per-user, per-day sentiment rollups, one document per (username, day):
+
+    {username, day: "YYYY-MM-DD", entries, score_sum, positive, negative, neutral}
+
+add_entry folds each entry in with an upserted $inc, so the trend endpoint
+reads one document per day instead of aggregating entries. rescore_entries
+moves re-scored entries between the counters with rescore_rollup_updates().
+`manage.py backfill_rollups` rebuilds them with rollup_pipeline().
+"""
+from pymongo import UpdateOne
+
+from .topic_stats import LABELS
+
+
+def entry_day(entry):
+    # date_added is "%Y-%m-%d %H:%M:%S", so the day is its first ten characters
+    return entry["date_added"][:10]
+
+
+def rollup_updates(entries):
+    """UpdateOne upserts folding the given entry documents into their day rollups."""
+    buckets = {}
+    for entry in entries:
+        key = (entry["username"], entry_day(entry))
+        inc = buckets.setdefault(key, {"entries": 0, "score_sum": 0.0})
+        inc["entries"] += 1
+        inc["score_sum"] += entry.get("score", 0) or 0
+        label = entry.get("sentiment", "neutral")
+        label = label if label in LABELS else "neutral"
+        inc[label] = inc.get(label, 0) + 1
+    return [
+        UpdateOne({"username": username, "day": day}, {"$inc": inc}, upsert=True)
+        for (username, day), inc in buckets.items()
+    ]
+
+
+def rescore_rollup_updates(changes):
+    """
+    UpdateOne ops moving re-scored entries from their old label and score to
+    their new ones. changes holds (old, new) pairs; old is the stored entry
+    document, new a dict with sentiment and score.
+    """
+    buckets = {}
+    for old, new in changes:
+        inc = buckets.setdefault((old["username"], entry_day(old)), {"score_sum": 0.0})
+        inc["score_sum"] += (new.get("score", 0) or 0) - (old.get("score", 0) or 0)
+        for entry, step in ((old, -1), (new, 1)):
+            label = entry.get("sentiment", "neutral")
+            label = label if label in LABELS else "neutral"
+            inc[label] = inc.get(label, 0) + step
+    return [
+        UpdateOne({"username": username, "day": day}, {"$inc": inc})
+        for (username, day), inc in buckets.items()
+    ]
+
+
+def present_rollup(doc):
+    entries = doc.get("entries", 0)
+    return {
+        "day": doc["day"],
+        "entries": entries,
+        "avg_score": doc.get("score_sum", 0.0) / entries if entries else 0.0,
+        "positive": doc.get("positive", 0),
+        "negative": doc.get("negative", 0),
+        "neutral": doc.get("neutral", 0),
+    }
+
+
+def rollup_pipeline(collection_name, match=None):
+    """Aggregation over entries that merges fresh day rollups into collection_name."""
+    count_of = lambda label: {"$sum": {"$cond": [{"$eq": ["$sentiment", label]}, 1, 0]}}  # noqa: E731
+    pipeline = [{"$match": match}] if match else []
+    pipeline += [
+        {"$group": {
+            "_id": {"username": "$username", "day": {"$substrBytes": ["$date_added", 0, 10]}},
+            "entries": {"$sum": 1},
+            "score_sum": {"$sum": {"$ifNull": ["$score", 0]}},
+            "positive": count_of("positive"),
+            "negative": count_of("negative"),
+        }},
+        {"$project": {
+            "_id": 0,
+            "username": "$_id.username",
+            "day": "$_id.day",
+            "entries": 1,
+            "score_sum": 1,
+            "positive": 1,
+            "negative": 1,
+            "neutral": {"$subtract": ["$entries", {"$add": ["$positive", "$negative"]}]},
+        }},
+        {"$merge": {
+            "into": collection_name,
+            "on": ["username", "day"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+    return pipeline
@@ -0,0 +1,259 @@
+"""
+Per-user inverted index over entries, ranked with BM25.
+
+Postings live in their own collection, one document per (username, term,
+entry) with the term frequency, token positions (for phrase queries), the
+entry length, and the entry's topic and sentiment so filters apply to the
+postings themselves:
+
+    {username, term, entry_id, topic_id, sentiment, tf, dl, pos: [...]}
+
+A per-user stats document holds the entry count and total token count for
+BM25's N and average length. Terms come from MiniVader's token stream,
+lowercased, keeping word tokens only, so search and scoring see the same
+words. add_entry indexes each new entry, and `manage.py rebuild_search_index`
+rebuilds the index from entries_collection. Re-scoring entries does not touch
+the postings' sentiment; rebuild after a lexicon change to filter on the new
+labels.
+
+Postings are upserts, so indexing an entry twice is harmless. An entry counts
+towards the stats only when at least one of its postings is new. Entries
+without words have no postings, can never match, and are left out of the
+stats.
+"""
+import math
+import re
+from collections import defaultdict
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from ..mini_vader import _WORD_RE
+
+K1 = 1.2
+B = 0.75
+
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+
+
+def tokens(analyzer, text):
+    """Lowercased word tokens of text, in order, as MiniVader tokenizes it."""
+    return [token.lower() for token in analyzer._tokenize(text or "") if _WORD_RE.match(token)]
+
+
+def parse_query(analyzer, query):
+    """Split a query into (terms, phrases); "double quoted" parts are phrases."""
+    phrases = []
+    for quoted in _PHRASE_RE.findall(query):
+        words = tokens(analyzer, quoted)
+        if words:
+            phrases.append(words)
+    terms = tokens(analyzer, _PHRASE_RE.sub(" ", query))
+    return terms, phrases
+
+
+class SearchIndex:
+    def __init__(self, postings_collection, stats_collection, analyzer):
+        self.postings = postings_collection
+        self.stats = stats_collection
+        self.analyzer = analyzer
+
+    def _posting_ops(self, entries, gen=None):
+        """
+        (upserts, owners, lengths): one upsert per (entry, term), the position
+        in `entries` each upsert belongs to, and each entry's token count.
+        """
+        upserts, owners, lengths = [], [], []
+        for k, entry in enumerate(entries):
+            words = tokens(self.analyzer, entry.get("text"))
+            lengths.append(len(words))
+            positions = defaultdict(list)
+            for position, word in enumerate(words):
+                positions[word].append(position)
+            for term, pos in positions.items():
+                fields = {
+                    "topic_id": entry.get("topic_id"),
+                    "sentiment": entry.get("sentiment", "neutral"),
+                    "tf": len(pos),
+                    "dl": len(words),
+                    "pos": pos,
+                }
+                if gen is not None:
+                    fields["gen"] = gen
+                upserts.append(UpdateOne(
+                    {"username": entry["username"], "term": term, "entry_id": entry["_id"]},
+                    {"$set": fields},
+                    upsert=True,
+                ))
+                owners.append(k)
+        return upserts, owners, lengths
+
+    def _write(self, entries, postings, gen=None):
+        """Upsert the postings of entries; returns (positions of entries that were new, lengths)."""
+        upserts, owners, lengths = self._posting_ops(entries, gen)
+        if not upserts:
+            return set(), lengths
+        result = postings.bulk_write(upserts, ordered=False)
+        return {owners[i] for i in result.upserted_ids}, lengths
+
+    @staticmethod
+    def _inc_stats(stats, entries, positions, lengths):
+        per_user = defaultdict(lambda: [0, 0])
+        for k in positions:
+            totals = per_user[entries[k]["username"]]
+            totals[0] += 1
+            totals[1] += lengths[k]
+        ops = [
+            UpdateOne({"username": username}, {"$inc": {"docs": docs, "total_len": total_len}}, upsert=True)
+            for username, (docs, total_len) in per_user.items()
+        ]
+        if ops:
+            stats.bulk_write(ops, ordered=False)
+
+    def add(self, entries):
+        """Index entry documents (they must already have their _id). Safe to repeat."""
+        entries = list(entries)
+        new, lengths = self._write(entries, self.postings)
+        self._inc_stats(self.stats, entries, new, lengths)
+
+    def clear(self, username=None):
+        scope = {"username": username} if username else {}
+        self.postings.delete_many(scope)
+        self.stats.delete_many(scope)
+
+    def rebuild(self, load, username=None, batch_size=1000, indexes=None, progress=None):
+        """
+        Rebuild the index while searches keep working. `load(after_id)` returns
+        the entries to index, sorted by _id and past after_id (all when None).
+        Returns the number of entries read.
+
+        For every user, postings and stats are built in scratch collections
+        (with `indexes`, {collection name: [IndexModel]}) and renamed over
+        the live ones. For one user, their postings are upserted with a new
+        generation tag, and older ones are deleted afterwards. Either way,
+        entries saved during the rebuild are indexed again at the end.
+        """
+        if username is None:
+            done, last_id = self._rebuild_all(load, batch_size, indexes or {}, progress)
+        else:
+            done, last_id = self._rebuild_user(load, username, batch_size, progress)
+        if last_id is not None:
+            for batch in _batches(load(last_id), batch_size):
+                self.add(batch)
+                done += len(batch)
+        return done
+
+    def _rebuild_all(self, load, batch_size, indexes, progress):
+        db = self.postings.database
+        postings = db[self.postings.name + "_rebuild"]
+        stats = db[self.stats.name + "_rebuild"]
+        postings.drop()
+        stats.drop()
+        for scratch, live in ((postings, self.postings), (stats, self.stats)):
+            if indexes.get(live.name):
+                scratch.create_indexes(indexes[live.name])
+
+        done, last_id = 0, None
+        for batch in _batches(load(None), batch_size):
+            new, lengths = self._write(batch, postings)
+            self._inc_stats(stats, batch, new, lengths)
+            done += len(batch)
+            last_id = batch[-1]["_id"]
+            if progress:
+                progress(done)
+        if last_id is None:
+            self.clear()
+            return 0, None
+        postings.rename(self.postings.name, dropTarget=True)
+        stats.rename(self.stats.name, dropTarget=True)
+        return done, last_id
+
+    def _rebuild_user(self, load, username, batch_size, progress):
+        gen = ObjectId()
+        done, last_id = 0, None
+        docs = total_len = 0
+        for batch in _batches(load(None), batch_size):
+            _, lengths = self._write(batch, self.postings, gen)
+            docs += sum(1 for n in lengths if n)
+            total_len += sum(lengths)
+            done += len(batch)
+            last_id = batch[-1]["_id"]
+            if progress:
+                progress(done)
+        # postings of deleted entries, and of entries saved meanwhile (indexed again below)
+        self.postings.delete_many({"username": username, "gen": {"$ne": gen}})
+        self.stats.update_one({"username": username}, {"$set": {"docs": docs, "total_len": total_len}}, upsert=True)
+        return done, last_id
+
+    def search(self, username, query, topic_id=None, sentiment=None, limit=20):
+        """
+        [(entry_id, score)] best first. Plain terms are optional and add to
+        the score; every quoted phrase must appear in a matching entry.
+        """
+        terms, phrases = parse_query(self.analyzer, query)
+        wanted = set(terms)
+        for phrase in phrases:
+            wanted.update(phrase)
+        if not wanted:
+            return []
+
+        stats = self.stats.find_one({"username": username}) or {}
+        n_docs = stats.get("docs", 0)
+        if not n_docs:
+            return []
+        avgdl = stats.get("total_len", 0) / n_docs or 1.0
+
+        match = {"username": username, "term": {"$in": sorted(wanted)}}
+        filtered = topic_id is not None or bool(sentiment)
+        if topic_id is not None:
+            match["topic_id"] = topic_id
+        if sentiment:
+            match["sentiment"] = sentiment
+        by_entry = defaultdict(dict)   # entry_id -> term -> posting
+        df = defaultdict(int)
+        for posting in self.postings.find(match, {"_id": 0, "term": 1, "entry_id": 1, "tf": 1, "dl": 1, "pos": 1}):
+            by_entry[posting["entry_id"]][posting["term"]] = posting
+            df[posting["term"]] += 1
+
+        if filtered:
+            # idf stays over the whole user corpus, not just the filtered slice
+            df = {row["_id"]: row["n"] for row in self.postings.aggregate([
+                {"$match": {"username": username, "term": {"$in": sorted(wanted)}}},
+                {"$group": {"_id": "$term", "n": {"$sum": 1}}},
+            ])}
+
+        scored = []
+        for entry_id, found in by_entry.items():
+            if phrases and not all(self._has_phrase(found, phrase) for phrase in phrases):
+                continue
+            score = 0.0
+            for term, posting in found.items():
+                n = df.get(term, 1)
+                idf = math.log(1 + (n_docs - n + 0.5) / (n + 0.5))
+                tf = posting["tf"]
+                score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * posting["dl"] / avgdl))
+            scored.append((entry_id, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    @staticmethod
+    def _has_phrase(found, phrase):
+        try:
+            starts = set(found[phrase[0]]["pos"])
+            for offset, word in enumerate(phrase[1:], 1):
+                starts &= {p - offset for p in found[word]["pos"]}
+        except KeyError:
+            return False
+        return bool(starts)
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class SentimentCache:
+    """
+    Bounded LRU cache in front of MiniVader.analyze. Keys are a digest of the
+    text plus the analyzer's lexicon version, so swapping or editing the
+    lexicon drops every stale result.
+    """
+
+    def __init__(self, analyzer, maxsize=1024):
+        self.analyzer = analyzer
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def lexicon_version(self):
+        return self.analyzer.lexicon_version
+
+    def _key(self, text):
+        return hashlib.blake2b((text or "").encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def analyze(self, text):
+        version = self.analyzer.lexicon_version
+        key = self._key(text)
+
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(result)
+            self.misses += 1
+
+        result = self.analyzer.analyze(text)
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return dict(result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "lexicon_version": self._version,
+            }
@@ -0,0 +1,122 @@
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from pymongo.errors import DuplicateKeyError
+
+from ..indexes import INDEXES
+from .summary_worker import SummaryWorker
+
+
+def summarize_texts(texts, sentences=3):
+    """
+    Summarize entry texts with LexRank and return the top sentences as strings.
+    SUMMARY_ENGINE picks sumy ("sumy"), the sparse native engine ("native"),
+    or ("auto") sumy for small topics and native from
+    SUMMARY_NATIVE_MIN_ENTRIES entries up.
+    """
+    texts = list(texts)
+    engine = getattr(settings, "SUMMARY_ENGINE", "auto")
+    if engine == "auto":
+        engine = "native" if len(texts) >= getattr(settings, "SUMMARY_NATIVE_MIN_ENTRIES", 200) else "sumy"
+
+    if engine == "native":
+        from .lexrank import LexRank
+        lexrank = LexRank(
+            max_sentences=getattr(settings, "SUMMARY_MAX_SENTENCES", 2000),
+            preselect=getattr(settings, "SUMMARY_PRESELECT", "tfidf"),
+        )
+        return lexrank.summarize(texts, sentences)
+
+    from sumy.parsers.plaintext import PlaintextParser
+    from sumy.nlp.tokenizers import Tokenizer
+    from sumy.summarizers.lex_rank import LexRankSummarizer
+
+    text = "\n".join(texts)
+    parser = PlaintextParser.from_string(text, Tokenizer("english"))
+    summarizer = LexRankSummarizer()
+    return [str(s) for s in summarizer(parser.document, sentences)]
+
+
+_indexed = set()
+_indexed_lock = threading.Lock()
+
+
+def ensure_summary_index(summaries_collection):
+    """
+    Create the unique topic_id index the stale-write guard below depends on,
+    once per process and collection. Without it, the $lte-filtered upsert of
+    an older job would insert a second summary for the topic instead of
+    failing. The spec comes from indexes.INDEXES, so ensure_indexes treats it
+    as already there.
+    """
+    key = (summaries_collection.database.name, summaries_collection.name)
+    if key in _indexed:
+        return
+    with _indexed_lock:
+        if key not in _indexed:
+            summaries_collection.create_indexes(INDEXES["summaries"])
+            _indexed.add(key)
+
+
+def build_topic_summary(topic_id, version, entries_collection, summaries_collection):
+    """Summarize a topic's entries and store the result for the given topic version."""
+    ensure_summary_index(summaries_collection)
+    # flagged near-duplicates would only repeat what the summary already ranks
+    entries = entries_collection.find({"topic_id": topic_id, "duplicate_of": {"$exists": False}},
+                                      {"_id": 0, "text": 1})
+    sentences = summarize_texts(e["text"] for e in entries)
+
+    try:
+        # never let a slow job for an older version overwrite a newer summary
+        summaries_collection.update_one(
+            {"topic_id": topic_id, "version": {"$lte": version}},
+            {"$set": {
+                "version": version,
+                "sentences": sentences,
+                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass  # a newer summary is already stored
+    return sentences
+
+
+@lru_cache(maxsize=None)
+def get_summary_worker():
+    """Process-wide background pool for summary refreshes."""
+    return SummaryWorker(
+        max_workers=getattr(settings, "SUMMARY_WORKERS", 2),
+        max_queue=getattr(settings, "SUMMARY_QUEUE_SIZE", 100),
+    )
+
+
+def get_topic_summary_nowait(topic, entries_collection, summaries_collection):
+    """
+    Stale-while-revalidate: return (sentences, refreshing, error) straight
+    away. When the stored summary is missing or older than the topic, the last
+    good one is returned and a refresh is queued on the background worker.
+    refreshing is only True while that refresh is actually pending; error is
+    "busy" when the worker's queue is full and "failed" when the previous
+    refresh for the topic raised (it is retried on this call), else None.
+    """
+    version = topic.get("version", 0)
+    cached = summaries_collection.find_one({"topic_id": topic["_id"]})
+    if cached and cached.get("version", -1) >= version:
+        return cached["sentences"], False, None
+
+    worker = get_summary_worker()
+    key = str(topic["_id"])
+    failed = worker.has_failed(key)
+    queued = worker.submit(
+        key, build_topic_summary,
+        topic["_id"], version, entries_collection, summaries_collection,
+    )
+    sentences = cached["sentences"] if cached else []
+    if not queued:
+        return sentences, False, "busy"
+    if failed:
+        return sentences, False, "failed"
+    return sentences, True, None
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryWorker:
+    """
+    In-process background pool for summary jobs. Jobs are keyed (by topic id),
+    so a second request for a topic that is already queued or running joins
+    the pending job instead of adding another one. The number of outstanding
+    jobs is bounded; once full, new jobs are rejected and the caller keeps
+    serving what it already has. The keys whose last job raised are kept until
+    the next submit for them, so callers can tell a failed refresh from one
+    that is still pending.
+    """
+
+    def __init__(self, max_workers=2, max_queue=100):
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summary")
+        self._lock = threading.Lock()
+        self._pending = {}   # key -> future, queued or running
+        self._running = 0
+        self._failed = set()   # keys whose last job raised
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+        self._run_last = 0.0
+
+    def submit(self, key, fn, *args):
+        """Queue fn(*args) under key. Returns False if the queue is full."""
+        with self._lock:
+            if key in self._pending:
+                self.deduplicated += 1
+                return True
+            if len(self._pending) >= self.max_queue:
+                self.rejected += 1
+                return False
+            self._failed.discard(key)
+            self.submitted += 1
+            self._pending[key] = self._executor.submit(self._run, key, time.perf_counter(), fn, args)
+            return True
+
+    def _run(self, key, queued_at, fn, args):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_total += started - queued_at
+        ok = False
+        try:
+            fn(*args)
+            ok = True
+        except Exception:
+            logger.exception("summary job %s failed", key)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._pending.pop(key, None)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                    self._failed.add(key)
+                self._run_total += elapsed
+                self._run_max = max(self._run_max, elapsed)
+                self._run_last = elapsed
+
+    def is_pending(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def has_failed(self, key):
+        """Whether the last finished job for key raised (and none was submitted since)."""
+        with self._lock:
+            return key in self._failed
+
+    def stats(self):
+        with self._lock:
+            finished = self.completed + self.failed
+            started = finished + self._running
+            return {
+                "queue_depth": len(self._pending) - self._running,
+                "running": self._running,
+                "max_queue": self.max_queue,
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": self._wait_total / started * 1000 if started else 0.0,
+                "avg_job_ms": self._run_total / finished * 1000 if finished else 0.0,
+                "max_job_ms": self._run_max * 1000,
+                "last_job_ms": self._run_last * 1000,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,76 @@
+"""
+Per-topic counters kept on the topic document, so listing pages never have
+to scan entries:
+
+    stats: {entries, positive, negative, neutral, score_sum, last_entry_at}
+
+add_entry applies stats_update() in the same update that bumps the topic's
+summary version and listing stamp, and rescore_entries moves re-scored
+entries between counters with rescore_update(), which only bumps the stamp. `manage.py reconcile_topic_stats` rebuilds them from the
+entries.
+"""
+
+LABELS = ("positive", "negative", "neutral")
+
+
+def stats_update(entries):
+    """Mongo update ($inc/$max) that folds the given entry documents into topic stats."""
+    inc = {"version": 1, "listing_version": 1, "stats.entries": 0, "stats.score_sum": 0.0}
+    last = None
+    for entry in entries:
+        inc["stats.entries"] += 1
+        inc["stats.score_sum"] += entry.get("score", 0) or 0
+        label = entry.get("sentiment", "neutral")
+        key = f"stats.{label if label in LABELS else 'neutral'}"
+        inc[key] = inc.get(key, 0) + 1
+        last = max(last or entry["date_added"], entry["date_added"])
+    # modified_at is the Last-Modified of the topic's entry listing
+    update = {"$inc": inc, "$currentDate": {"modified_at": True}}
+    if last:
+        update["$max"] = {"stats.last_entry_at": last}
+    return update
+
+
+def rescore_update(changes):
+    """
+    Mongo update ($inc) that moves re-scored entries from their old label and
+    score to their new ones. changes holds (old, new) pairs of dicts with
+    sentiment and score.
+    """
+    # the entry set is unchanged, so the cached summary (keyed by version) stays valid
+    inc = {"listing_version": 1, "stats.score_sum": 0.0}
+    for old, new in changes:
+        inc["stats.score_sum"] += (new.get("score", 0) or 0) - (old.get("score", 0) or 0)
+        for entry, step in ((old, -1), (new, 1)):
+            label = entry.get("sentiment", "neutral")
+            key = f"stats.{label if label in LABELS else 'neutral'}"
+            inc[key] = inc.get(key, 0) + step
+    return {"$inc": inc, "$currentDate": {"modified_at": True}}
+
+
+def present_stats(topic):
+    """JSON-friendly stats for a topic document (missing counters read as zero)."""
+    stats = topic.get("stats") or {}
+    entries = stats.get("entries", 0)
+    return {
+        "entries": entries,
+        "positive": stats.get("positive", 0),
+        "negative": stats.get("negative", 0),
+        "neutral": stats.get("neutral", 0),
+        "avg_score": stats.get("score_sum", 0.0) / entries if entries else 0.0,
+        "last_entry_at": stats.get("last_entry_at"),
+    }
+
+
+def stats_pipeline(match=None):
+    """Aggregation that recomputes every topic's stats from the entries collection."""
+    pipeline = [{"$match": match}] if match else []
+    pipeline.append({"$group": {
+        "_id": "$topic_id",
+        "entries": {"$sum": 1},
+        "score_sum": {"$sum": {"$ifNull": ["$score", 0]}},
+        "positive": {"$sum": {"$cond": [{"$eq": ["$sentiment", "positive"]}, 1, 0]}},
+        "negative": {"$sum": {"$cond": [{"$eq": ["$sentiment", "negative"]}, 1, 0]}},
+        "last_entry_at": {"$max": "$date_added"},
+    }})
+    return pipeline
@@ -0,0 +1,226 @@
+import numpy as np
+
+from ..mini_vader import _PUNCT_RE
+
+
+class CorpusScorer:
+    """
+    Batch scorer that runs MiniVader's per-token rules as NumPy array ops.
+
+    Texts are tokenized into integer ids against a growing vocabulary, and the
+    valence, negation, intensifier and caps rules are applied to the whole
+    batch at once through lookup arrays indexed by id. The compound score is
+    normalized for the whole batch in one pass.
+
+    Results equal MiniVader.analyze exactly. Phrase matches and "but" clauses
+    are not vectorized. Texts that would take either path, or that are blank,
+    are handed back to the scalar analyzer. The same goes for texts with a
+    token that is both an intensifier and a lexicon word. Bulk jobs over
+    ordinary notes take the array path. Handed-back texts cost more than a
+    plain analyze() call, so last_fallback_rate records the share of the
+    last batch that took the scalar path.
+
+    The analyzer must be frozen: token features are cached per vocabulary id,
+    and phrase starts come from the trie that freeze() builds.
+    """
+
+    def __init__(self, analyzer):
+        if analyzer._phrase_trie is None:
+            raise ValueError("CorpusScorer needs a frozen analyzer")
+        self.analyzer = analyzer
+        self._vocab = {}
+        self._features = []   # one tuple per vocabulary id, see _token_features
+        self._arrays = None
+        self.last_fallback_rate = 0.0
+
+    def _token_features(self, token):
+        a = self.analyzer
+        lower = token.lower()
+        is_emoji = token in a.emoji_lexicon
+        is_punct = not is_emoji and bool(_PUNCT_RE.fullmatch(token))
+        is_neg = not (is_emoji or is_punct) and lower in a.negations
+        is_int = not (is_emoji or is_punct or is_neg) and lower in a.intensifiers
+        is_lex = lower in a.lexicon
+        return (
+            a.lexicon.get(lower, 0.0) if is_lex else 0.0,
+            is_lex,
+            a.emoji_lexicon.get(token, 0.0),
+            is_emoji,
+            is_punct,
+            is_neg,
+            is_int,
+            a.intensifiers.get(lower, 1.0) if is_int else 1.0,
+            a.caps_boost if a._is_all_caps(token) else 1.0,
+            is_int and is_lex,   # ambiguous: the scalar path treats it both ways
+            lower in a._phrase_trie,
+        )
+
+    def _ids(self, tokens):
+        vocab = self._vocab
+        ids = [vocab.get(token) for token in tokens]
+        if None in ids:
+            for k, token in enumerate(tokens):
+                if ids[k] is None:
+                    token_id = vocab.get(token)
+                    if token_id is None:
+                        token_id = vocab[token] = len(self._features)
+                        self._features.append(self._token_features(token))
+                        self._arrays = None
+                    ids[k] = token_id
+        return ids
+
+    def _feature_arrays(self):
+        if self._arrays is None:
+            cols = list(zip(*self._features)) if self._features else [()] * 11
+            self._arrays = (
+                np.array(cols[0], dtype=np.float64),   # valence
+                np.array(cols[1], dtype=bool),         # in lexicon
+                np.array(cols[2], dtype=np.float64),   # emoji valence
+                np.array(cols[3], dtype=bool),         # emoji
+                np.array(cols[4], dtype=bool),         # punctuation
+                np.array(cols[5], dtype=bool),         # negation
+                np.array(cols[6], dtype=bool),         # intensifier
+                np.array(cols[7], dtype=np.float64),   # intensifier multiplier
+                np.array(cols[8], dtype=np.float64),   # caps factor
+                np.array(cols[9], dtype=bool),         # ambiguous
+                np.array(cols[10], dtype=bool),        # may start a phrase
+            )
+        return self._arrays
+
+    def _has_phrase(self, tokens):
+        roots = self.analyzer._phrase_trie
+        for i, token in enumerate(tokens):
+            if token.lower() in roots and self.analyzer._match_phrase(tokens, i)[0]:
+                return True
+        return False
+
+    def analyze_corpus(self, texts):
+        """Score a list of texts, returning one analyze()-shaped dict per text."""
+        texts = list(texts)
+        results = [None] * len(texts)
+
+        batch, batch_tokens, batch_ids, lengths, ex_counts, q_counts = [], [], [], [], [], []
+        for n, text in enumerate(texts):
+            if not text or not text.strip() or " but " in text.lower():
+                results[n] = self.analyzer.analyze(text)
+                continue
+            tokens = self.analyzer._tokenize(text)
+            batch.append(n)
+            batch_tokens.append(tokens)
+            batch_ids.extend(self._ids(tokens))
+            lengths.append(len(tokens))
+            ex, q = self.analyzer._count_exclamation_question(text)
+            ex_counts.append(ex)
+            q_counts.append(q)
+
+        fallbacks = len(texts) - len(batch)
+        if not batch:
+            self.last_fallback_rate = fallbacks / len(texts) if texts else 0.0
+            return results
+
+        (valence, in_lex, emoji_val, is_emoji, is_punct,
+         is_neg, is_int, mult, caps, ambiguous, phrase_root) = self._feature_arrays()
+
+        ids = np.array(batch_ids, dtype=np.int64)
+        lengths = np.array(lengths, dtype=np.int64)
+        n_docs = len(batch)
+        doc = np.repeat(np.arange(n_docs), lengths)
+        n_tok = len(ids)
+
+        # texts with a phrase match or an ambiguous token go back to the scalar path
+        bad_docs = np.zeros(n_docs, dtype=bool)
+        if n_tok:
+            bad_docs[doc[ambiguous[ids]]] = True
+            maybe_phrase = np.zeros(n_docs, dtype=bool)
+            maybe_phrase[doc[phrase_root[ids]]] = True
+            for k in np.flatnonzero(maybe_phrase & ~bad_docs):
+                bad_docs[k] = self._has_phrase(batch_tokens[k])
+        self.last_fallback_rate = (fallbacks + int(bad_docs.sum())) / len(texts)
+
+        lex = in_lex[ids]
+        # lexicon word one / two tokens ahead within the same text
+        same1 = np.zeros(n_tok, dtype=bool)
+        same2 = np.zeros(n_tok, dtype=bool)
+        same1[:-1] = doc[1:] == doc[:-1]
+        same2[:-2] = doc[2:] == doc[:-2]
+        lex1 = np.zeros(n_tok, dtype=bool)
+        lex2 = np.zeros(n_tok, dtype=bool)
+        lex1[:-1] = lex[1:]
+        lex2[:-2] = lex[2:]
+        lex1 &= same1
+        lex2 &= same2
+
+        intens = is_int[ids]
+        hit1 = intens & lex1
+        hit2 = intens & ~lex1 & lex2
+
+        # an intensifier that reaches two ahead skips the token in between,
+        # and its target is consumed rather than scored on its own
+        skipped = np.zeros(n_tok, dtype=bool)
+        skipped[1:] = hit2[:-1]
+        consumed = np.zeros(n_tok, dtype=bool)
+        consumed[1:] |= hit1[:-1]
+        consumed[2:] |= hit2[:-2]
+        live = ~(skipped | consumed)
+
+        emoji = is_emoji[ids] & live
+        negation = is_neg[ids] & live
+        word = ~(is_emoji[ids] | is_punct[ids] | is_neg[ids] | intens) & live
+
+        target = np.arange(n_tok)
+        target[hit1] += 1
+        target[hit2] += 2
+        boosted = (hit1 | hit2) & live
+
+        scored = (word & lex) | boosted
+        values = np.where(boosted, mult[ids], 1.0)
+        values = valence[ids[target]] * values * caps[ids[target]]
+
+        # negation is sticky until the next scored word in the same text
+        neg_seen = np.cumsum(negation)
+        events = np.flatnonzero(scored)
+        if len(events):
+            ev_doc = doc[events]
+            before = neg_seen[events]
+            prev = np.empty_like(before)
+            prev[1:] = before[:-1]
+            first = np.ones(len(events), dtype=bool)
+            first[1:] = ev_doc[1:] != ev_doc[:-1]
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            start_tok = starts[ev_doc[first]]
+            prev[first] = neg_seen[start_tok] - negation[start_tok]
+            flip = before - prev > 0
+            values[events[flip]] = -values[events[flip]]
+
+        contrib = np.zeros(n_tok, dtype=np.float64)
+        contrib[scored] = values[scored]
+        contrib[emoji] = emoji_val[ids[emoji]]
+
+        raw = np.bincount(doc, weights=contrib, minlength=n_docs)
+        pos = np.bincount(doc, weights=np.where(contrib > 0, contrib, 0.0), minlength=n_docs)
+        neg = np.bincount(doc, weights=np.where(contrib < 0, -contrib, 0.0), minlength=n_docs)
+        neu = np.bincount(doc, weights=(word & ~lex).astype(np.float64), minlength=n_docs)
+
+        a = self.analyzer
+        raw = raw * (1.0 + np.minimum(np.array(ex_counts), 4) * a.exclam_boost +
+                     np.minimum(np.array(q_counts), 4) * a.question_boost)
+        compound = self.normalize(raw)
+
+        for k, n in enumerate(batch):
+            if bad_docs[k]:
+                results[n] = a.analyze(texts[n])
+                continue
+            c = float(compound[k])
+            label = "positive" if c > 0.05 else "negative" if c < -0.05 else "neutral"
+            results[n] = {"compound": c, "label": label, "pos": float(pos[k]),
+                          "neg": float(neg[k]), "neu": int(neu[k])}
+        return results
+
+    @staticmethod
+    def normalize(raw_scores, alpha=15.0):
+        """Vectorized MiniVader._normalize_score over an array of raw scores."""
+        raw_scores = np.asarray(raw_scores, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            compound = raw_scores / np.sqrt(raw_scores * raw_scores + alpha)
+        compound = np.where(raw_scores == 0, 0.0, compound)
+        return np.clip(compound, -1.0, 1.0)
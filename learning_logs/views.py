@@ -1,9 +1,18 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from bson import ObjectId
-from datetime import datetime
-from .mongo_client import topics_collection, entries_collection
+from datetime import datetime, timedelta
+import time
+from .mongo_client import topics_collection, entries_collection, rollups_collection, users_collection
 # from .db import topics_collection, entries_collection
-from .mini_vader import MiniVader
+from .dedupe import dedupe_mode, get_deduper
+from .search import get_search_index, index_entries
+from .sentiment import get_scorer
+from .utils.conditional import (bump_user_stamp, finish, get_listing_cache, precondition,
+                                 topic_stamp, user_stamp)
+from .utils.json_stream import BATCH_SIZE, stream_array
+from .utils.pagination import fetch_page, page_params, wants_everything, wants_stream
+from .utils.rollups import present_rollup, rollup_updates
+from .utils.topic_stats import present_stats, stats_update
 
 from django.shortcuts import render
 from django.shortcuts import render, redirect
@@ -45,115 +54,262 @@ def entries_page(request):
         "topic_id": str(topic_id)  # ✅ send topic_id as plain string
     })
 
-def add_topic(request):
-    """Add a new topic (like 'Machine Learning' or 'Chess')."""
+# The request -> response logic of the JSON endpoints lives in the helpers
+# below, shared with async_views.py. Helpers that parse a request never block;
+# the ones that touch MongoDB do, and the async views run those on the I/O pool.
+
+def new_topic(request):
+    """The topic an add_topic request asks for, or the error response."""
     username = request.COOKIES.get("username")
     if not username:
-        return JsonResponse({"error": "Not logged in"}, status=401)
+        return None, JsonResponse({"error": "Not logged in"}, status=401)
 
     topic_text = request.GET.get("text")
     if not topic_text:
-        return JsonResponse({"error": "Missing 'text' parameter."}, status=400)
+        return None, JsonResponse({"error": "Missing 'text' parameter."}, status=400)
 
-    topic = {
+    return {
         "text": topic_text,
         "username": username,
         "date_added": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
+    }, None
+
 
+def create_topic(topic):
     result = topics_collection.insert_one(topic)
+    bump_user_stamp(users_collection, topic["username"])
     return JsonResponse({
         "message": "Topic added successfully!",
         "topic_id": str(result.inserted_id)
     })
 
 
-def get_topics(request):
-    """Get all topics for the logged-in user."""
-    username = request.COOKIES.get("username")
-    if not username:
-        return JsonResponse({"error": "Not logged in"}, status=401)
+def add_topic(request):
+    """Add a new topic (like 'Machine Learning' or 'Chess')."""
+    topic, error = new_topic(request)
+    if error is not None:
+        return error
+    return create_topic(topic)
+
+
+def list_topics(request, username):
+    """The topics response for a logged-in user: a 304, a page, or ?all=1's array."""
+    # answer a revalidation from the user's stamp before reading any topics
+    cache = get_listing_cache()
+    validators, response = precondition(
+        request, f"topics:{username}", user_stamp(users_collection, username), cache)
+    if response is not None:
+        return response
+
+    query = {"username": username}
+    projection = {"_id": 1, "text": 1, "date_added": 1, "stats": 1}
+
+    if wants_everything(request):
+        data = list(topics_collection.find(query, projection))
+        for topic in data:
+            topic["_id"] = str(topic["_id"])
+            topic["stats"] = present_stats(topic)
+        return finish(JsonResponse(data, safe=False), validators, cache)
+
+    try:
+        limit, after = page_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    data = list(topics_collection.find({"username": username}, {"_id": 1, "text": 1, "date_added": 1}))
+    data, next_cursor = fetch_page(topics_collection, query, projection, limit, after)
     for topic in data:
         topic["_id"] = str(topic["_id"])
-    return JsonResponse(data, safe=False)
+        topic["stats"] = present_stats(topic)
+    return finish(JsonResponse({"items": data, "next": next_cursor}), validators, cache)
 
 
+def get_topics(request):
+    """
+    Get the logged-in user's topics a page at a time:
+    ?limit=N&after=<cursor> -> {"items": [...], "next": <cursor or null>}.
+    ?all=1 returns the old unpaginated array.
+    """
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "Not logged in"}, status=401)
+    return list_topics(request, username)
+
 
 from django.http import JsonResponse
 from bson import ObjectId
 from datetime import datetime
 from .mongo_client import topics_collection, entries_collection
-from .mini_vader import MiniVader 
 
-analyzer = MiniVader()
+analyzer = get_scorer()
 
 
-def add_entry(request):
-    """Add an entry under a specific topic using topic_id."""
+def new_entry(topic_obj_id, text, username, senti):
+    return {
+        "topic_id": topic_obj_id,
+        "text": text,
+        "username": username,
+        "sentiment": senti.get("label", "neutral"),
+        "score": senti.get("compound", 0),
+        "lexicon_version": analyzer.lexicon_version,
+        "date_added": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def check_duplicate(entry):
+    """
+    Look for a stored near-duplicate of a new entry. Returns (signature,
+    match): match is (entry_id, similarity) or None, and when flagging, the
+    entry is marked with duplicate_of.
+    """
+    deduper = get_deduper()
+    if deduper is None:
+        return None, None
+    sig = deduper.signature(entry["text"])
+    match = deduper.find_duplicate(entry["username"], sig)
+    if match and dedupe_mode() == "flag":
+        entry["duplicate_of"] = match[0]
+    return sig, match
+
+
+def duplicate_rejected(match):
+    return JsonResponse({
+        "error": "Near-duplicate of an existing entry.",
+        "duplicate_of": str(match[0]),
+        "similarity": match[1],
+    }, status=409)
+
+
+def save_entry(entry, sig=None):
+    """Store a new entry and fold it into its topic and day counters; False if the topic is gone."""
+    # one update checks the topic exists, bumps its version (the cached summary
+    # is now stale) and folds the entry into its counters. It runs before the
+    # insert so a bad topic_id never writes an entry; if the insert then fails,
+    # reconcile_topic_stats repairs the counters.
+    updated = topics_collection.update_one({"_id": entry["topic_id"]}, stats_update([entry]))
+    if not updated.matched_count:
+        return False
+    entries_collection.insert_one(entry)
+
+    rollups_collection.bulk_write(rollup_updates([entry]), ordered=False)
+    bump_user_stamp(users_collection, entry["username"])  # topic stats on /topics/ changed
+    index_entries([entry])
+    if sig is not None:
+        get_deduper().add([(entry, sig)])
+    return True
+
+
+def entry_params(request):
+    """(topic_obj_id, text, username) from an add_entry request, or the error response."""
     topic_id = request.GET.get("topic_id")
     entry_text = request.GET.get("text")
     username = request.COOKIES.get("username")   # ✅ GET USERNAME
 
     if not topic_id or not entry_text:
-        return JsonResponse({"error": "Both 'topic_id' and 'text' are required."}, status=400)
+        return None, JsonResponse({"error": "Both 'topic_id' and 'text' are required."}, status=400)
 
     if not username:
-        return JsonResponse({"error": "User not logged in, username missing in cookies."}, status=401)
+        return None, JsonResponse({"error": "User not logged in, username missing in cookies."}, status=401)
 
     try:
         topic_obj_id = ObjectId(topic_id)
     except Exception:
-        return JsonResponse({"error": "Invalid topic_id format."}, status=400)
+        return None, JsonResponse({"error": "Invalid topic_id format."}, status=400)
 
-    # Check if topic exists
-    topic = topics_collection.find_one({"_id": topic_obj_id})
-    if not topic:
-        return JsonResponse({"error": "Topic not found."}, status=404)
+    return (topic_obj_id, entry_text, username), None
 
-    senti = analyzer.analyze(entry_text)
 
-    # ✅ Sentiment analysis
-    senti = analyzer.analyze(entry_text)
+def create_entry(topic_obj_id, text, username, senti):
+    """Dedupe-check and store a scored entry, and build the add_entry response."""
+    entry = new_entry(topic_obj_id, text, username, senti)
 
-    entry = {
-        "topic_id": topic_obj_id,
-        "text": entry_text,
-        "username": username,
-        "sentiment": senti.get("label", "neutral"),
-        "score": senti.get("score", 0),
-        "date_added": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
+    sig, match = check_duplicate(entry)
+    if match and dedupe_mode() == "reject":
+        return duplicate_rejected(match)
 
-    entries_collection.insert_one(entry)
+    if not save_entry(entry, sig):
+        return JsonResponse({"error": "Topic not found."}, status=404)
 
-    return JsonResponse({
+    response = {
         "message": "Entry added successfully!",
         "sentiment": senti
-    })
+    }
+    if match:
+        response["duplicate_of"] = str(match[0])
+        response["similarity"] = match[1]
+    return JsonResponse(response)
 
 
+def add_entry(request):
+    """Add an entry under a specific topic using topic_id."""
+    params, error = entry_params(request)
+    if error is not None:
+        return error
+    topic_obj_id, entry_text, username = params
 
+    # ✅ Sentiment analysis
+    senti = analyzer.analyze(entry_text)
+    return create_entry(topic_obj_id, entry_text, username, senti)
 
-def get_entries(request):
-    """Get all entries for a given topic."""
+
+def topic_param(request):
+    """The ObjectId of a request's ?topic_id=, or the error response."""
     topic_id = request.GET.get("topic_id")
 
     if not topic_id:
-        return JsonResponse({"error": "Missing 'topic_id' parameter."}, status=400)
+        return None, JsonResponse({"error": "Missing 'topic_id' parameter."}, status=400)
 
     try:
-        topic_obj_id = ObjectId(topic_id)
+        return ObjectId(topic_id), None
     except Exception:
-        return JsonResponse({"error": "Invalid topic_id format."}, status=400)
+        return None, JsonResponse({"error": "Invalid topic_id format."}, status=400)
+
 
-    entries = list(entries_collection.find(
-        {"topic_id": topic_obj_id},
-        {"_id": 0, "text": 1, "date_added": 1, "sentiment": 1, "score": 1}  # ✅ include sentiment
-    ))
+def list_entries(request, topic_obj_id, stream_response):
+    """
+    The entries response for a topic: a 304, a page, ?all=1's array, or for
+    ?stream=1 whatever stream_response builds from the (unread) cursor.
+    """
+    # answer a revalidation from the topic's version before reading any entries
+    cache = get_listing_cache()
+    validators, response = precondition(
+        request, f"entries:{topic_obj_id}", topic_stamp(topics_collection, topic_obj_id), cache)
+    if response is not None:
+        return response
 
-    return JsonResponse(entries, safe=False)
+    query = {"topic_id": topic_obj_id}
+    projection = {"text": 1, "date_added": 1, "sentiment": 1, "score": 1}  # ✅ include sentiment
+
+    if wants_stream(request):
+        cursor = entries_collection.find(query, {"_id": 0, **projection}).batch_size(BATCH_SIZE)
+        return finish(stream_response(cursor), validators)
+
+    if wants_everything(request):
+        entries = list(entries_collection.find(query, {"_id": 0, **projection}))
+        return finish(JsonResponse(entries, safe=False), validators, cache)
+
+    try:
+        limit, after = page_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    entries, next_cursor = fetch_page(entries_collection, query, projection, limit, after)
+    for entry in entries:
+        del entry["_id"]
+    return finish(JsonResponse({"items": entries, "next": next_cursor}), validators, cache)
+
+
+def get_entries(request):
+    """
+    Get a topic's entries a page at a time, oldest first:
+    ?topic_id=..&limit=N&after=<cursor> -> {"items": [...], "next": <cursor or null>}.
+    ?all=1 returns the old unpaginated array, ?stream=1 the same array
+    streamed from the cursor in batches.
+    """
+    topic_obj_id, error = topic_param(request)
+    if error is not None:
+        return error
+    return list_entries(request, topic_obj_id, lambda cursor: StreamingHttpResponse(
+        stream_array(cursor), content_type="application/json"))
 
 
 
@@ -222,9 +378,8 @@ def register_page(request):
 
 # username = request.COOKIES.get("username") 
 # topics = list(topics_collection.find({"username": username}))
-from .utils.activity_graph import ActivityGraph
+from .activity import get_activity_buffer, get_activity_graph
 
-from .mongo_client import activities_collection
 
 def view_topic(request, topic_id):
     username = request.COOKIES.get("username")
@@ -234,7 +389,7 @@ def view_topic(request, topic_id):
     topic = topics_collection.find_one({"_id": ObjectId(topic_id)})
     entries = list(entries_collection.find({"topic_id": ObjectId(topic_id)}))
 
-    tracker = ActivityGraph(activities_collection, username)
+    tracker = get_activity_graph(username)
     tracker.add_activity(topic["text"])
 
     return render(request, "view_topic.html", {"topic": topic, "entries": entries})
@@ -242,29 +397,222 @@ def view_topic(request, topic_id):
 
 from django.shortcuts import render
 from bson.objectid import ObjectId
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lex_rank import LexRankSummarizer
 
-from .mongo_client import topics_collection, entries_collection
+from .mongo_client import topics_collection, entries_collection, summaries_collection
+from .utils.summaries import get_topic_summary_nowait, get_summary_worker
 
-def summ(request, topic_id):
+def summary_context(topic_id):
     topic = topics_collection.find_one({"_id": ObjectId(topic_id)})
-    entries = list(entries_collection.find({"topic_id": ObjectId(topic_id)}))
 
     if not topic:
-        return render(request, "learning_logs/summary.html", {
+        return {
             "topic": "Unknown Topic",
             "summary": []
-        })
-
-    text = "\n".join(e["text"] for e in entries)
+        }
 
-    parser = PlaintextParser.from_string(text, Tokenizer("english"))
-    summarizer = LexRankSummarizer()
-    summary = summarizer(parser.document, 3)
+    # serve the last good summary right away; a stale one is rebuilt in the background
+    summary, refreshing, error = get_topic_summary_nowait(topic, entries_collection, summaries_collection)
 
-    return render(request, "learning_logs/summary.html", {
+    return {
         "topic": topic["text"],
-        "summary": [str(s) for s in summary]  # convert sentence objects to strings
-    })
+        "summary": summary,
+        "refreshing": refreshing,
+        "error": error
+    }
+
+
+def summ(request, topic_id):
+    return render(request, "learning_logs/summary.html", summary_context(topic_id))
+
+
+def summary_stats(request):
+    """Queue depth and job latency of the background summary worker."""
+    return JsonResponse(get_summary_worker().stats())
+
+
+def activity_stats(request):
+    """Buffered counts and flush latency of the activity write-behind buffer."""
+    buffer = get_activity_buffer()
+    return JsonResponse(buffer.stats() if buffer else {"enabled": False})
+
+
+from django.conf import settings
+
+from .mongo_client import health
+
+
+def db_health(request):
+    """
+    Mongo ping plus connection pool stats for this worker process. The pid,
+    client options and driver error are left out unless DB_HEALTH_DETAILS is on.
+    """
+    report = health(details=getattr(settings, "DB_HEALTH_DETAILS", False))
+    return JsonResponse(report, status=200 if report["ok"] else 503)
+
+
+TREND_MAX_DAYS = 366
+
+
+def sentiment_trend(request):
+    """
+    Daily entry count and sentiment for the logged-in user, read from the
+    rollups: ?days=N (default 30) -> {"days": [{day, entries, avg_score, ...}]}.
+    Days without entries are filled with zeros so charts get a continuous axis.
+    """
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "Not logged in"}, status=401)
+
+    try:
+        days = int(request.GET.get("days", 30))
+    except ValueError:
+        return JsonResponse({"error": "'days' must be an integer."}, status=400)
+    if not 1 <= days <= TREND_MAX_DAYS:
+        return JsonResponse({"error": f"'days' must be between 1 and {TREND_MAX_DAYS}."}, status=400)
+
+    today = datetime.now().date()
+    first = (today - timedelta(days=days - 1)).isoformat()
+    found = {
+        doc["day"]: present_rollup(doc)
+        for doc in rollups_collection.find({"username": username, "day": {"$gte": first}},
+                                           {"_id": 0}).sort("day", 1)
+    }
+
+    series = []
+    for offset in range(days - 1, -1, -1):
+        day = (today - timedelta(days=offset)).isoformat()
+        series.append(found.get(day) or present_rollup({"day": day}))
+    return JsonResponse({"days": series})
+
+
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .utils.bulk_import import PayloadTooLarge, read_body, run_import
+
+
+@csrf_exempt
+@require_POST
+def bulk_add_entries(request):
+    """
+    Import many entries at once from an NDJSON or JSON-array body; see
+    utils/bulk_import.py. Bad items are reported per index, the rest are saved.
+    """
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "User not logged in, username missing in cookies."}, status=401)
+
+    try:
+        body = read_body(request, request.META.get("CONTENT_LENGTH"),
+                         getattr(settings, "BULK_IMPORT_MAX_BYTES", 32 * 1024 * 1024))
+        report = run_import(
+            body,
+            request.content_type or "",
+            username,
+            max_items=getattr(settings, "BULK_IMPORT_MAX_ITEMS", 10000),
+            chunk_size=getattr(settings, "BULK_IMPORT_CHUNK_SIZE", 1000),
+        )
+    except PayloadTooLarge as e:
+        return JsonResponse({"error": str(e)}, status=413)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(report)
+
+
+LEADERBOARD_MAX_K = 100
+HEATMAP_MAX_DAYS = 366
+
+
+def activity_leaderboard(request):
+    """The user's most and least visited topics: ?k=N (default 10) -> {"top": [...], "bottom": [...]}."""
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "Not logged in"}, status=401)
+
+    try:
+        k = int(request.GET.get("k", 10))
+    except ValueError:
+        return JsonResponse({"error": "'k' must be an integer."}, status=400)
+    if not 1 <= k <= LEADERBOARD_MAX_K:
+        return JsonResponse({"error": f"'k' must be between 1 and {LEADERBOARD_MAX_K}."}, status=400)
+
+    graph = get_activity_graph(username)
+    return JsonResponse({"top": graph.top(k), "bottom": graph.bottom(k)})
+
+
+def activity_heatmap(request):
+    """Weekday-by-hour grid and per-day totals of topic views: ?days=N (default 28)."""
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "Not logged in"}, status=401)
+
+    try:
+        days = int(request.GET.get("days", 28))
+    except ValueError:
+        return JsonResponse({"error": "'days' must be an integer."}, status=400)
+    if not 1 <= days <= HEATMAP_MAX_DAYS:
+        return JsonResponse({"error": f"'days' must be between 1 and {HEATMAP_MAX_DAYS}."}, status=400)
+
+    return JsonResponse(get_activity_graph(username).buckets.heatmap(username, days))
+
+
+SEARCH_MAX_RESULTS = 100
+
+
+def search_entries(request):
+    """
+    Full-text search over the user's entries, BM25 ranked:
+    ?q=words "exact phrase"&topic_id=..&sentiment=positive&limit=N.
+    Plain words are optional and rank results; quoted phrases must match.
+    """
+    username = request.COOKIES.get("username")
+    if not username:
+        return JsonResponse({"error": "Not logged in"}, status=401)
+
+    index = get_search_index()
+    if index is None:
+        return JsonResponse({"error": "Search is disabled."}, status=404)
+
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Missing 'q' parameter."}, status=400)
+
+    topic_obj_id = None
+    topic_id = request.GET.get("topic_id")
+    if topic_id:
+        try:
+            topic_obj_id = ObjectId(topic_id)
+        except Exception:
+            return JsonResponse({"error": "Invalid topic_id format."}, status=400)
+
+    sentiment = request.GET.get("sentiment") or None
+    if sentiment not in (None, "positive", "negative", "neutral"):
+        return JsonResponse({"error": "'sentiment' must be positive, negative or neutral."}, status=400)
+
+    try:
+        limit = min(int(request.GET.get("limit", 20)), SEARCH_MAX_RESULTS)
+    except ValueError:
+        return JsonResponse({"error": "'limit' must be an integer."}, status=400)
+
+    start = time.perf_counter()
+    hits = index.search(username, query, topic_id=topic_obj_id, sentiment=sentiment, limit=max(limit, 1))
+    docs = {doc["_id"]: doc for doc in entries_collection.find(
+        {"_id": {"$in": [entry_id for entry_id, _ in hits]}},
+        {"topic_id": 1, "text": 1, "sentiment": 1, "score": 1, "date_added": 1},
+    )} if hits else {}
+
+    results = []
+    for entry_id, rank in hits:
+        doc = docs.get(entry_id)
+        if doc is None:  # deleted since it was indexed
+            continue
+        results.append({
+            "entry_id": str(entry_id),
+            "topic_id": str(doc["topic_id"]),
+            "text": doc["text"],
+            "sentiment": doc.get("sentiment"),
+            "score": doc.get("score"),
+            "date_added": doc.get("date_added"),
+            "rank": rank,
+        })
+    return JsonResponse({"results": results, "took_ms": round((time.perf_counter() - start) * 1000, 2)})
@@ -82,6 +82,22 @@ DATABASES = {
     }
 }
 
+# MongoDB (learning_logs/mongo_client.py connects lazily, once per process)
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "learning_log")
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = 60000
+MONGO_CONNECT_TIMEOUT_MS = 5000
+MONGO_SERVER_SELECTION_TIMEOUT_MS = 5000
+MONGO_SOCKET_TIMEOUT_MS = 30000
+MONGO_WAIT_QUEUE_TIMEOUT_MS = 2000
+# e.g. "zstd,snappy,zlib"; zstd/snappy need their python packages
+MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS") or None
+# /health/db/ is unauthenticated: it only shows ok, ping time and pool counters
+# unless this adds the pid, client options and driver error
+DB_HEALTH_DETAILS = os.environ.get("DB_HEALTH_DETAILS") == "1"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,3 +139,63 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Sentiment scoring
+# Max MiniVader results kept in the in-process LRU cache (0 disables it)
+SENTIMENT_CACHE_SIZE = 2048
+# Optional external lexicon: a term<TAB>valence file or a compiled .mvlx artifact
+SENTIMENT_LEXICON_PATH = os.environ.get("SENTIMENT_LEXICON_PATH") or None
+# score_batch keeps using the NumPy corpus scorer only while at most this share
+# of a sample needs the scalar path (phrases, "but"); past ~0.4 it is slower
+SENTIMENT_CORPUS_MAX_FALLBACK = 0.3
+
+# Background summary refresh (learning_logs/utils/summary_worker.py)
+SUMMARY_WORKERS = 2
+SUMMARY_QUEUE_SIZE = 100
+# "sumy", "native" (sparse LexRank in learning_logs/utils/lexrank.py) or "auto"
+SUMMARY_ENGINE = "auto"
+SUMMARY_NATIVE_MIN_ENTRIES = 200
+# native engine: cap on sentences in the graph and how they are picked ("tfidf" or "recent")
+SUMMARY_MAX_SENTENCES = 2000
+SUMMARY_PRESELECT = "tfidf"
+
+# Bulk entry import (POST /entries/bulk/)
+BULK_IMPORT_MAX_ITEMS = 10000
+BULK_IMPORT_CHUNK_SIZE = 1000
+# body size limit of /entries/bulk/, which reads the body itself instead of
+# going through DATA_UPLOAD_MAX_MEMORY_SIZE
+BULK_IMPORT_MAX_BYTES = 32 * 1024 * 1024
+
+# Async JSON views (learning_logs/async_views.py), served when running under ASGI.
+# Set ASYNC_VIEWS=1 in the environment of the ASGI deployment.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "") in ("1", "true", "yes")
+# threads for blocking pymongo calls; keep at or below MONGO_MAX_POOL_SIZE
+ASYNC_IO_THREADS = 32
+# threads for MiniVader / LexRank work (None = one per CPU)
+ASYNC_CPU_THREADS = None
+
+# Conditional GET on /topics/ and /entries/ (learning_logs/utils/conditional.py):
+# recent listing bodies kept in process, keyed by ETag (0 disables the cache)
+LISTING_CACHE_SIZE = 0
+
+# Write-behind buffer for page-view activity (learning_logs/utils/activity_buffer.py)
+ACTIVITY_BUFFER = True
+ACTIVITY_FLUSH_INTERVAL = 5.0    # seconds between background flushes
+ACTIVITY_FLUSH_MAX_KEYS = 1000   # flush early once this many (user, topic) pairs are pending
+# in-process top-k/bottom-k cache: users kept (0 disables it) and seconds before a reload
+ACTIVITY_LEADERBOARD_CACHE_USERS = 1000
+ACTIVITY_LEADERBOARD_TTL = 60.0
+# topics seeded from each end of a user's ranking; bigger k queries go to Mongo directly
+ACTIVITY_LEADERBOARD_DEPTH = 100
+
+# Full-text search over entries (learning_logs/utils/search_index.py); add_entry
+# indexes as it writes, `manage.py rebuild_search_index` rebuilds
+SEARCH_INDEX = True
+
+# Near-duplicate entries (learning_logs/utils/dedupe.py): "off", "flag" (saved with
+# duplicate_of and left out of summaries) or "reject" (refused with 409)
+DEDUPE_MODE = "flag"
+# estimated Jaccard similarity of word 3-gram sets at which two entries count as duplicates
+DEDUPE_THRESHOLD = 0.8
+# texts with fewer word 3-grams than this (under 7 words by default) are never checked
+DEDUPE_MIN_SHINGLES = 5